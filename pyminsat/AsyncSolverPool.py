@@ -0,0 +1,281 @@
+import asyncio
+import contextlib
+import io
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pyminsat.ResultCache import formula_hash
+from pyminsat.Solver import Solver, SolverInterrupted
+
+
+class SolverPoolFull(Exception):
+    """
+    Raised by pool.solve() when max_pending solves are already running or waiting for a worker.
+    """
+    pass
+
+
+class _InFlight:
+    """
+    A running solve shared by every caller of the same formula.
+    """
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class LocalSolverPool:
+    """
+    asyncio front end of the solver. Solves run in threads of this process.
+
+    This is the stand-in of AsyncSolverPool for tests and local use: it has the same API and behaviour
+    (coalescing, backpressure, cancellation) without worker processes.
+    Note: as the solver is pure python, threads do not solve in parallel.
+
+    With a ResultCache, repeated formulas are answered from the cache without reaching a worker.
+
+    Usage:
+        async with LocalSolverPool(workers=2) as pool:
+            model = await pool.solve([['a', '-b'], ['b']], budget=5)
+    """
+    def __init__(self, workers=None, max_pending=64, result_cache=None):
+        self._nworkers = workers if workers is not None else (os.cpu_count() or 1)
+        self.__maxpending = max_pending
+        self.__resultcache = result_cache
+        self.__inflight = {}
+        # every running solve, including the cancelled ones no longer in __inflight
+        self.__tasks = set()
+        self.__pending = 0
+        self._executor = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self._nworkers)
+        self.__slots = asyncio.Semaphore(self._nworkers)
+
+    async def close(self):
+        tasks = list(self.__tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def solve(self, formula, budget=None):
+        """
+        Solve the formula without blocking the event loop.
+        Concurrent calls with the same formula (see ResultCache.formula_hash()) share a single solve.
+        The budget of the first call is used for the shared solve.
+
+        Cancelling the call (e.g asyncio.wait_for() timeout) interrupts the solver
+        once no other caller is waiting for the same formula.
+
+        :param
+            formula: list of clauses, each one a list of literals in str format. example: [['a', '-b'], ['c']]
+        :param
+            budget: optional number of seconds for the solver (see solver.find_solution(time_budget))
+        :return:
+            model: if the formula is satisfiable
+            None: otherwise
+        :raises
+            SolverPoolFull: if max_pending solves are already in flight
+            SolverInterrupted: if the budget is exhausted
+        """
+        key = formula_hash(formula)
+        if self.__resultcache is not None:
+            hit, model = self.__resultcache.cached(key, formula)
+            if hit:
+                return model
+        entry = self.__inflight.get(key)
+        if entry is None:
+            if self.__pending >= self.__maxpending:
+                raise SolverPoolFull()
+            self.__pending += 1
+            entry = _InFlight(asyncio.ensure_future(self.__run(key, formula, budget)))
+            self.__inflight[key] = entry
+            self.__tasks.add(entry.task)
+            entry.task.add_done_callback(lambda task: self.__finished(key, entry))
+        entry.waiters += 1
+        try:
+            model = await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            entry.waiters -= 1
+            if entry.waiters == 0 and not entry.task.done():
+                entry.task.cancel()
+                # a new call for the same formula must start a new solve, not join the cancelled one
+                self.__forget(key, entry)
+            raise
+        entry.waiters -= 1
+        return dict(model) if model is not None else None
+
+    def __forget(self, key, entry):
+        if self.__inflight.get(key) is entry:
+            del self.__inflight[key]
+
+    def __finished(self, key, entry):
+        # the key may already map to a newer solve of the same formula
+        self.__forget(key, entry)
+        self.__tasks.discard(entry.task)
+        self.__pending -= 1
+
+    async def __run(self, key, formula, budget):
+        status, payload = await self._execute(formula, budget)
+        if status == 'interrupted':
+            raise SolverInterrupted()
+        if status == 'error':
+            raise RuntimeError(payload)
+        if self.__resultcache is not None:
+            self.__resultcache.store(key, payload)
+        return payload
+
+    async def _execute(self, formula, budget):
+        """
+        Run one solve and wait for it.
+        :return: (status, payload) as returned by _solveformula()
+        """
+        async with self.__slots:
+            solver = Solver()
+            future = asyncio.get_running_loop().run_in_executor(self._executor, _solveformula, solver, formula, budget)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # interrupt() only stops a running search: repeat it until the worker gets there
+                while not future.done():
+                    solver.interrupt()
+                    await asyncio.wait([future], timeout=0.01)
+                raise
+
+
+class AsyncSolverPool(LocalSolverPool):
+    """
+    asyncio front end of the solver with a pool of warm worker processes.
+    Every worker keeps pyminsat imported and solves one formula at a time.
+
+    Backpressure: at most max_pending formulas are accepted (running or waiting for a free worker),
+    further calls raise SolverPoolFull.
+    Cancellation: a cancelled solve sets the worker's cancel id, a watcher thread in the worker
+    then calls solver.interrupt().
+
+    Usage:
+        async with AsyncSolverPool(workers=4) as pool:
+            model = await pool.solve([['a', '-b'], ['b']], budget=5)
+    """
+    def __init__(self, workers=None, max_pending=64, mp_context='spawn', result_cache=None):
+        LocalSolverPool.__init__(self, workers, max_pending, result_cache)
+        self.__context = multiprocessing.get_context(mp_context)
+        self.__workers = []
+        self.__jobids = itertools.count(1)
+
+    async def start(self):
+        # two blocking calls (send / recv) per busy worker
+        self._executor = ThreadPoolExecutor(max_workers=2 * self._nworkers)
+        self.__idle = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        for i in range(0, self._nworkers):
+            worker = await loop.run_in_executor(self._executor, _WorkerProcess, self.__context)
+            self.__workers.append(worker)
+            self.__idle.put_nowait(worker)
+
+    async def close(self):
+        await LocalSolverPool.close(self)
+        for worker in self.__workers:
+            worker.stop()
+        self.__workers = []
+
+    async def _execute(self, formula, budget):
+        worker = await self.__idle.get()
+        loop = asyncio.get_running_loop()
+        job_id = next(self.__jobids)
+        try:
+            await loop.run_in_executor(self._executor, worker.conn.send, (job_id, formula, budget))
+            reply = loop.run_in_executor(self._executor, worker.recv, job_id)
+            try:
+                return await asyncio.shield(reply)
+            except asyncio.CancelledError:
+                worker.cancel.value = job_id
+                await asyncio.wait([reply])
+                raise
+        finally:
+            self.__idle.put_nowait(worker)
+
+
+class _WorkerProcess:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.cancel = context.Value('q', 0, lock=False)
+        self.process = context.Process(target=_workermain, args=(child_conn, self.cancel), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def recv(self, job_id):
+        """
+        Wait for the reply of the given job. Replies of older (cancelled) jobs are skipped.
+        :return: (status, payload)
+        """
+        while True:
+            reply_id, result = self.conn.recv()
+            if reply_id == job_id:
+                return result
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+def _workermain(conn, cancel):
+    """
+    Main loop of a worker process: receives (job id, formula, budget), sends back (job id, (status, payload)).
+    """
+    while True:
+        job = conn.recv()
+        if job is None:
+            return
+        job_id, formula, budget = job
+        solver = Solver()
+        done = threading.Event()
+        watcher = threading.Thread(target=_watchcancel, args=(solver, cancel, job_id, done), daemon=True)
+        watcher.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = _solveformula(solver, formula, budget)
+        done.set()
+        watcher.join()
+        conn.send((job_id, result))
+
+
+def _watchcancel(solver, cancel, job_id, done):
+    while not done.wait(0.01):
+        if cancel.value == job_id:
+            # repeated until the job is over: interrupt() only stops a running search
+            solver.interrupt()
+
+
+def _solveformula(solver, formula, budget):
+    """
+    :return:
+        ('sat', model), ('unsat', None), ('interrupted', None) or ('error', message)
+    """
+    try:
+        for clause in formula:
+            solver.add_problem_clause_db(clause)
+        model = solver.find_solution(time_budget=budget)
+    except SolverInterrupted:
+        return 'interrupted', None
+    except Exception as e:
+        return 'error', repr(e)
+    return ('sat', model) if model is not None else ('unsat', None)
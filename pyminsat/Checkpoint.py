@@ -0,0 +1,162 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+# On-disk layout of a solver checkpoint:
+#     header (see _HEADER)
+#     variable symbols (utf-8, NUL separated)
+#     problem clause offsets (int32, nclauses + 1) | problem clause literals (int32)
+#     learnt clause offsets (int32, nlearnts + 1)  | learnt clause literals (int32) | learnt activities (float64)
+#     pb constraint offsets (int32, nconstraints + 1) | pb literals (int32) | pb coefficients (int64) | pb degrees (int64)
+#     xor offsets (int32, nxors + 1) | xor variables (int32) | xor rhs (int32)
+#     level-0 units (int32)
+#     literal activities (float64, 2 per variable: positive literal first, NaN if the literal is unknown)
+# Every section starts on an 8 byte boundary so that the int/float arrays can be viewed in place from a mmap.
+# Literals are stored DIMACS style: variable index + 1, negative if the literal is negated.
+_MAGIC = b'PYMSCKPT'
+_VERSION = 3
+_HEADER = struct.Struct('<8sHBxIIIIIIIIIIIdd')
+_BYTEORDER = {'little': 0, 'big': 1}
+
+
+def _padding(size):
+    return (8 - size % 8) % 8
+
+
+class CheckpointData:
+    """
+    Flat view of a checkpoint file.
+    All the int/float sections are memoryviews over the mapped file (or copies if the byte order differs),
+    hence the object must be closed (or used as a context manager) once the solver state is rebuilt.
+    """
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        (magic, version, byteorder, nvars, names_size, nclauses, nclauselits, nlearnts, nlearntlits,
+         nconstraints, nconstraintlits, nxors, nxorlits, nunits, self.variableinc, self.clauseinc) = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError("not a pyminsat checkpoint: " + str(path))
+        if version != _VERSION:
+            self.close()
+            raise ValueError("unsupported checkpoint version: " + str(version))
+        self.__swap = byteorder != _BYTEORDER[sys.byteorder]
+        self.__offset = _HEADER.size + _padding(_HEADER.size)
+
+        names = bytes(self._map[self.__offset:self.__offset + names_size])
+        self.__offset += names_size + _padding(names_size)
+        self.symbols = names.decode('utf-8').split('\0') if nvars > 0 else []
+
+        self.clauseoffsets = self.__section('i', nclauses + 1)
+        self.clauselits = self.__section('i', nclauselits)
+        self.learntoffsets = self.__section('i', nlearnts + 1)
+        self.learntlits = self.__section('i', nlearntlits)
+        self.learntactivity = self.__section('d', nlearnts)
+        self.constraintoffsets = self.__section('i', nconstraints + 1)
+        self.constraintlits = self.__section('i', nconstraintlits)
+        self.constraintcoeffs = self.__section('q', nconstraintlits)
+        self.constraintdegrees = self.__section('q', nconstraints)
+        self.xoroffsets = self.__section('i', nxors + 1)
+        self.xorlits = self.__section('i', nxorlits)
+        self.xorrhs = self.__section('i', nxors)
+        self.units = self.__section('i', nunits)
+        self.literalactivity = self.__section('d', 2 * nvars)
+
+    def __section(self, typecode, count):
+        """
+        Returns a view of the next section of the file and moves the read offset past it.
+        :param typecode: array typecode of the section items ('i', 'q' or 'd')
+        :param count: number of items in the section
+        :return: A memoryview (or an array, if the file was written with a different byte order)
+        """
+        size = array(typecode).itemsize * count
+        raw = memoryview(self._map)[self.__offset:self.__offset + size]
+        self.__offset += size + _padding(size)
+        if self.__swap:
+            items = array(typecode, raw.tobytes())
+            items.byteswap()
+            raw.release()
+            return items
+        view = raw.cast(typecode)
+        self._views.append(raw)
+        self._views.append(view)
+        return view
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def write_checkpoint(path, symbols, clauses, learnts, learnt_activity, constraints, constraint_coeffs,
+                     constraint_degrees, xors, xor_rhs, units, literal_activity, variable_inc, clause_inc):
+    """
+    Write the flat solver state to path.
+    The file is written next to path and renamed over it, so an interrupted write never leaves a torn checkpoint.
+
+    :param path: destination file path
+    :param symbols: variable symbols in index order
+    :param clauses: list of problem clauses, each one a list of DIMACS style int literals
+    :param learnts: list of learnt clauses, each one a list of DIMACS style int literals
+    :param learnt_activity: clause activity of every learnt clause
+    :param constraints: list of pseudo-boolean constraints, each one a list of DIMACS style int literals
+    :param constraint_coeffs: list of coefficient lists of the pseudo-boolean constraints
+    :param constraint_degrees: degree of every pseudo-boolean constraint
+    :param xors: list of XOR constraints, each one a list of variable indexes + 1
+    :param xor_rhs: rhs (0 or 1) of every XOR constraint
+    :param units: DIMACS style int literals assigned at decision level 0
+    :param literal_activity: float array of 2 * len(symbols) literal activities
+    :param variable_inc: current variable activity increment of the solver
+    :param clause_inc: current clause activity increment of the solver
+    :return: None
+    """
+    names = '\0'.join(symbols).encode('utf-8')
+    clause_offsets, clause_lits = _flatten(clauses)
+    learnt_offsets, learnt_lits = _flatten(learnts)
+    constraint_offsets, constraint_lits = _flatten(constraints)
+    xor_offsets, xor_lits = _flatten(xors)
+    coeffs = array('q')
+    for constraint in constraint_coeffs:
+        coeffs.extend(constraint)
+    header = _HEADER.pack(_MAGIC, _VERSION, _BYTEORDER[sys.byteorder], len(symbols), len(names),
+                          len(clauses), len(clause_lits), len(learnts), len(learnt_lits),
+                          len(constraints), len(constraint_lits), len(xors), len(xor_lits), len(units),
+                          variable_inc, clause_inc)
+
+    tmp_path = str(path) + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        for section in (header, names, clause_offsets, clause_lits, learnt_offsets, learnt_lits,
+                        array('d', learnt_activity), constraint_offsets, constraint_lits, coeffs,
+                        array('q', constraint_degrees), xor_offsets, xor_lits, array('i', xor_rhs),
+                        array('i', units), literal_activity):
+            data = section.tobytes() if isinstance(section, array) else section
+            f.write(data)
+            f.write(b'\0' * _padding(len(data)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _flatten(clauses):
+    """
+    Flatten a list of int literal lists into an offsets array and a literals array
+    :param clauses: list of lists of int literals
+    :return: (offsets, lits) int arrays. Clause i is lits[offsets[i]:offsets[i + 1]]
+    """
+    offsets = array('i', [0])
+    lits = array('i')
+    for clause in clauses:
+        lits.extend(clause)
+        offsets.append(len(lits))
+    return offsets, lits
@@ -7,7 +7,9 @@ class Clause:
                 return
         if len(self._lits) == 1:
             # if no. of literals is 1, the clause can be unit-propagated
-            solver._enqueue(self._lits[0], self)
+            if not solver._enqueue(self._lits[0], self):
+                # the literal is already False in zeroth decision level
+                solver._ok = False
         else:
             # add the clauses to the watches list of lits[0] and lits[1]
             solver._watches[self._lits[0]._varsymbol].append(self)
@@ -26,33 +28,64 @@ class Clause:
             solver._clauses.append(self)
     clause_activity = 1
 
+    @classmethod
+    def _fromliterals(cls, solver, lit_obj_list, bump_activity=True):
+        """
+        Create a problem clause from already simplified literal objects (see solver.add_clauses_array()).
+        The clause must have at least two literals, none of them assigned. Hence, _simplify() is skipped.
+        :param solver: A solver object
+        :param lit_obj_list: A literal object list
+        :param bump_activity: False if the activities of the first literals are bumped in bulk by the solver
+        :return: the new Clause object
+        """
+        clause = cls.__new__(cls)
+        clause._lits = lit_obj_list
+        clause.__learnt = False
+        solver._watches[lit_obj_list[0]._varsymbol].append(clause)
+        solver._watches[lit_obj_list[1]._varsymbol].append(clause)
+        if bump_activity:
+            solver._bumpvariableactivityinclause(lit_obj_list)
+        solver._clauses.append(clause)
+        return clause
 
     def _simplify(self, solver):
         """
         This method is used to simply a clause by doing the followings:
-            1. if there is no literals, the clause will be empty and can be removed.
-            2. if any literal is True, the clause can be removed as it will evaluate to True in zeroth decision level
-            3. Remove any literal that evaluates to False during initialisation as it will not be useful
-            4. If a literal and its negation exists in the same clause,
+            1. if any literal is True, the clause can be removed as it will evaluate to True in zeroth decision level
+            2. If a literal and its negation exists in the same clause,
                 the clause can be removed as it will definitely evaluate to True in zeroth decision level.
+            3. Remove any literal that evaluates to False during initialisation as it will not be useful.
+                Duplicate literals are removed as well.
+            4. if there is no literals left, the clause cannot be satisfied. Hence, the problem is unsatisfiable.
+        Note: clauses are added in the zeroth decision level (see solver.add_problem_clause_db())
         :param solver: A solver object
         :return:
             1. True if the clause is removed from solver object
             2. False otherwise
         """
-        if len(self._lits) == 0:
-            print("Empty clause. Hence, it will be removed.")
-            return True
+        lits = []
+        # variable symbol -> negate flag of the literals seen so far
+        seen = {}
         for lit in self._lits:
+            lit_val = solver._valueOf(lit)
             # if any of the literal evaluates to True, we can remove whole clause itself
-            if solver._valueOf(lit):
-                return True
-            # id p and ~p exists in the same clause, the clause can be removed
-            elif lit._isnegationexists(self._lits):
+            if lit_val:
                 return True
-            elif solver._valueOf(lit) is False:
-                self._lits.remove(lit)  # false literals can be removed as it will be of no use for the clause.
-                return len(self._lits) == 0
+            negate = seen.get(lit._varsymbol)
+            if negate is not None:
+                # id p and ~p exists in the same clause, the clause can be removed
+                if negate != lit._negate:
+                    return True
+                continue
+            seen[lit._varsymbol] = lit._negate
+            # false literals can be removed as it will be of no use for the clause.
+            if lit_val is None:
+                lits.append(lit)
+        self._lits = lits
+        if len(self._lits) == 0:
+            print("Empty clause. Hence, the problem cannot be satisfied.")
+            solver._ok = False
+            return True
         return False
 
     def __swap(self, index_1, index_2):
@@ -164,6 +197,21 @@ class Clause:
         if self.__learnt:
             solver._bumpclauseactivity(self)
 
+    def _implicationlevel(self, solver, lit):
+        """
+        Decision level at which this clause implies lit, i.e the highest decision level of its other literals.
+        With chronological back-tracking, it can be lower than the current decision level of the solver.
+        :param solver: A solver object.
+        :param
+            lit: the implied literal (Literal Object) or None for the decision level of a conflict
+        :return: A number
+        """
+        level = 0
+        for q in self._lits:
+            if q is not lit:
+                level = max(level, solver._getvariableobject(q._varsymbol)._decisionlevel)
+        return level
+
     def _removeclause(self, solver):
         """
         This method is used to remove a learnt clause.
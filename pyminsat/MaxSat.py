@@ -0,0 +1,259 @@
+import time
+
+from pyminsat.Solver import Solver, SolverInterrupted
+
+
+class MaxSatSolver:
+    """
+    Weighted MaxSAT on top of a single incremental Solver.
+    Hard clauses must be satisfied, the total weight of the violated soft clauses is minimised.
+
+    Every soft clause C (with more than one literal) is relaxed with a new variable r: the hard clause (C | r) is added
+    and r becomes the "violation literal" of C. The violation literal of a unit soft clause [l] is -l.
+
+    Two algorithms are available, both reuse the same solver (and its learnt clauses) for every iteration:
+        'oll'    : core-guided search. The negations of the violation literals are used as assumptions,
+                   every unsat core raises the lower bound and is relaxed through a totalizer (OLL).
+        'linear' : SAT-UNSAT search. The violation literals are summed up with a weighted totalizer
+                   and every model tightens the upper bound (the totalizer outputs >= bound are forbidden),
+                   until the solver reports UnSat.
+
+    Usage:
+        maxsat = MaxSatSolver()
+        maxsat.add_hard(['a', 'b'])
+        maxsat.add_soft(['-a'], weight=2)
+        maxsat.add_soft(['-b'], weight=1)
+        model = maxsat.solve(algorithm='oll', time_budget=10)
+        maxsat.cost, maxsat.optimal
+    """
+    def __init__(self, solver=None):
+        self._solver = solver if solver is not None else Solver()
+        # soft clauses: (literals, weight, violation literal)
+        self._softs = []
+        self._relaxvars = set()
+        self.__nvars = 0
+
+        self.upper_bound = None
+        self.lower_bound = 0
+        self.cost = None
+        self.optimal = False
+        self.best_model = None
+
+    def add_hard(self, literals):
+        """
+        :param
+            literals String[]: Array of Strings
+            example: ['a', '-b', 'c']
+        :return: None
+        """
+        self._solver.add_problem_clause_db(literals)
+
+    def add_soft(self, literals, weight=1):
+        """
+        :param
+            literals String[]: Array of Strings
+            example: ['a', '-b', 'c']
+        :param
+            weight: positive integer, the cost of violating the clause
+        :return: None
+        """
+        if weight <= 0:
+            raise ValueError("weight of a soft clause must be positive")
+        literals = [lit.lower() for lit in literals]
+        if len(literals) == 1:
+            violation = _negate(literals[0])
+        else:
+            violation = self._newvar()
+            self._solver.add_problem_clause_db(literals + [violation])
+        self._softs.append((literals, weight, violation))
+
+    def solve(self, algorithm='oll', time_budget=None, on_upper_bound=None):
+        """
+        :param
+            algorithm: 'oll' or 'linear'
+        :param
+            time_budget: optional number of seconds for the whole optimisation.
+            When it is exhausted, the best model found so far is returned and self.optimal stays False.
+        :param
+            on_upper_bound: optional callable(cost, model), called every time a better model is found.
+        :return:
+            model (dict) with the lowest cost found, or None if the hard clauses cannot be satisfied
+            (or if no model was found within the time budget).
+            self.cost, self.lower_bound, self.upper_bound and self.optimal describe the result.
+        """
+        if algorithm not in ('oll', 'linear'):
+            raise ValueError("unknown MaxSAT algorithm: " + str(algorithm))
+        self.__deadline = time.monotonic() + time_budget if time_budget is not None else None
+        self.__onupperbound = on_upper_bound
+        self.optimal = False
+        # a call can follow an interrupted one (or new soft clauses): the bounds of the search start over,
+        # the best model is kept as the first upper bound
+        self.lower_bound = 0
+        if self.best_model is not None:
+            self.cost = self.upper_bound = self.__cost(self.best_model)
+        try:
+            model = self.__sat(None)
+            if model is None:
+                # hard clauses cannot be satisfied
+                return None
+            self.__improve(model)
+            if algorithm == 'oll':
+                self.__oll()
+            else:
+                self.__linear()
+        except SolverInterrupted:
+            pass
+        return self.best_model
+
+    def __oll(self):
+        """
+        Core-guided search (OLL). weights maps every assumption (a literal which should be True) to its remaining weight.
+        For a core with minimum weight w:
+            1. the lower bound is increased by w and w is subtracted from the weight of every assumption of the core
+            2. a totalizer counts the violated assumptions of the core. As one of them has to be violated,
+                the assumption "at most 1 violated" is added with weight w.
+        When the assumption "at most k violated" of a totalizer is part of a core, "at most k + 1 violated" is added.
+        :return: None
+        """
+        weights = {}
+        for literals, weight, violation in self._softs:
+            assumption = _negate(violation)
+            weights[assumption] = weights.get(assumption, 0) + weight
+        # assumption "-outputs[k]" of a totalizer -> (totalizer, k, weight)
+        bounds = {}
+        while self.lower_bound < self.upper_bound:
+            assumptions = [a for a in weights if weights[a] > 0]
+            model = self.__sat(assumptions)
+            if model is not None:
+                self.__improve(model)
+                break
+            core = self._solver.get_unsat_core()
+            if len(core) == 0:
+                break
+            min_weight = min(weights[a] for a in core)
+            self.lower_bound += min_weight
+            for a in core:
+                weights[a] -= min_weight
+                if a in bounds:
+                    totalizer, k, weight = bounds.pop(a)
+                    if k + 1 in totalizer.outputs:
+                        bound = _negate(totalizer.outputs[k + 1])
+                        weights[bound] = weights.get(bound, 0) + weight
+                        bounds[bound] = (totalizer, k + 1, weight)
+            if len(core) > 1:
+                totalizer = _Totalizer(self, [(1, _negate(a)) for a in core], len(core))
+                if 2 in totalizer.outputs:
+                    bound = _negate(totalizer.outputs[2])
+                    weights[bound] = weights.get(bound, 0) + min_weight
+                    bounds[bound] = (totalizer, 2, min_weight)
+        self.optimal = self.lower_bound >= self.upper_bound
+
+    def __linear(self):
+        """
+        SAT-UNSAT search. A weighted totalizer over the violation literals is built once (up to the first upper bound).
+        Every better model forbids (with assumptions) the totalizer outputs with sum >= the new upper bound,
+        hence the learnt clauses and the totalizer stay valid for every iteration, and for a later solve() call.
+        :return: None
+        """
+        if self.upper_bound == 0:
+            self.optimal = True
+            return
+        totalizer = _Totalizer(self, [(weight, violation) for literals, weight, violation in self._softs],
+                               self.upper_bound)
+        while self.upper_bound > 0:
+            model = self.__sat([_negate(totalizer.outputs[total]) for total in totalizer.outputs
+                                if total >= self.upper_bound])
+            if model is None:
+                self.lower_bound = self.upper_bound
+                self.optimal = True
+                return
+            self.__improve(model)
+        self.optimal = True
+
+    def __sat(self, assumptions):
+        """
+        Run the solver with the remaining time budget.
+        :param assumptions: Array of literals in str format or None
+        :return: model or None
+        :raises SolverInterrupted: when the time budget is exhausted
+        """
+        budget = None
+        if self.__deadline is not None:
+            budget = self.__deadline - time.monotonic()
+            if budget <= 0:
+                raise SolverInterrupted()
+        return self._solver.find_solution(assumptions=assumptions, time_budget=budget)
+
+    def __improve(self, model):
+        """
+        Update the upper bound / best model if the model violates less weight than the best model so far.
+        :param model: model returned by the solver
+        :return: None
+        """
+        cost = self.__cost(model)
+        if self.upper_bound is None or cost < self.upper_bound:
+            self.upper_bound = cost
+            self.cost = cost
+            self.best_model = {var: model[var] for var in model if var not in self._relaxvars}
+            if self.__onupperbound is not None:
+                self.__onupperbound(cost, dict(self.best_model))
+
+    def __cost(self, model):
+        """
+        :param model: model returned by the solver (or the best model)
+        :return: total weight of the soft clauses violated by the model
+        """
+        cost = 0
+        for literals, weight, violation in self._softs:
+            if not any(model.get(lit[1:] if lit.startswith('-') else lit, False) != lit.startswith('-')
+                       for lit in literals):
+                cost += weight
+        return cost
+
+    def _newvar(self):
+        """
+        :return: a new variable symbol (str) for relaxation / totalizer variables
+        """
+        self.__nvars += 1
+        var = '#maxsat' + str(self.__nvars)
+        self._relaxvars.add(var)
+        return var
+
+
+class _Totalizer:
+    """
+    Weighted totalizer: outputs[s] is implied True when the total weight of the True input literals is at least s.
+    Sums greater than the cap are merged into outputs[cap].
+    Only the "at least" direction is encoded, which is enough to forbid sums from the upper bound side.
+    """
+    def __init__(self, maxsat, inputs, cap):
+        self.outputs = self.__build(maxsat, inputs, cap)
+
+    def __build(self, maxsat, inputs, cap):
+        if len(inputs) == 1:
+            weight, lit = inputs[0]
+            return {min(weight, cap): lit}
+        middle = len(inputs) // 2
+        left = self.__build(maxsat, inputs[:middle], cap)
+        right = self.__build(maxsat, inputs[middle:], cap)
+        outputs = {}
+
+        def _output(total):
+            total = min(total, cap)
+            if total not in outputs:
+                outputs[total] = maxsat._newvar()
+            return outputs[total]
+
+        for total in left:
+            maxsat.add_hard([_negate(left[total]), _output(total)])
+        for total in right:
+            maxsat.add_hard([_negate(right[total]), _output(total)])
+        for left_total in left:
+            for right_total in right:
+                maxsat.add_hard([_negate(left[left_total]), _negate(right[right_total]),
+                                 _output(left_total + right_total)])
+        return outputs
+
+
+def _negate(lit):
+    return lit[1:] if lit.startswith('-') else '-' + lit
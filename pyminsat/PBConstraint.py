@@ -0,0 +1,137 @@
+class PBConstraint:
+    """
+    A pseudo-boolean constraint in the normalised form:
+        coeffs[0] * lits[0] + coeffs[1] * lits[1] + ... >= degree
+    where every coefficient is a positive integer and every variable occurs at most once.
+    (see Solver.add_linear() for the normalisation of <= constraints)
+
+    The constraint is propagated with a counter:
+        slack = sum of the coefficients of non-False literals - degree
+        1. if slack < 0, the constraint cannot be satisfied anymore (conflict)
+        2. if the coefficient of an unassigned literal is greater than slack,
+            the literal must be True. i.e it is enqueued with this constraint as its reason.
+    Every variable of the constraint watches it, so the slack is decreased in _propagate() when a literal becomes False
+    and increased again in _undo() when the variable is unassigned.
+    """
+    def __init__(self, solver, lits, coeffs, degree):
+        # literals are sorted by their coefficients (largest first), so that the implication scan can stop early
+        order = sorted(range(0, len(lits)), key=lambda i: -coeffs[i])
+        self._lits = solver._getliteralobjectlist([lits[i] for i in order])
+        self._coeffs = [coeffs[i] for i in order]
+        self._degree = degree
+        self._slack = sum(self._coeffs) - degree
+        self._counted = [False] * len(self._lits)
+        self._index = {}
+        for i in range(0, len(self._lits)):
+            var = self._lits[i]._varsymbol
+            self._index[var] = i
+            solver._watches[var].append(self)
+            solver._pbwatches.setdefault(var, []).append(self)
+        solver._constraints.append(self)
+
+        # zeroth level assignments which are already propagated will not be sent to _propagate() again.
+        for i in range(0, len(self._lits)):
+            if solver._valueOf(self._lits[i]) is False:
+                self._counted[i] = True
+                self._slack -= self._coeffs[i]
+        if self._slack < 0:
+            solver._ok = False
+        else:
+            self.__enqueueimplied(solver)
+
+    def _propagate(self, solver, var):
+        """
+        This method is used to propagate the constraint after a variable watching it is assigned a value.
+        The constraint is always added back to the variable's watches list.
+
+        :param solver: A solver object
+        :param var: a variable symbol in str format
+        :return:
+            1. False if the constraint cannot be satisfied anymore (conflict)
+            2. True otherwise
+        """
+        solver._watches[var].append(self)
+        i = self._index[var]
+        if solver._valueOf(self._lits[i]) is not False:
+            return True
+        if self._counted[i]:
+            # propagated again after a chronological back-tracking, the slack may have grown since
+            return self.__enqueueimplied(solver)
+        self._counted[i] = True
+        self._slack -= self._coeffs[i]
+        if self._slack < 0:
+            return False
+        return self.__enqueueimplied(solver)
+
+    def __enqueueimplied(self, solver):
+        """
+        Enqueue every unassigned literal whose coefficient is greater than the slack.
+        :param solver: A solver object
+        :return: True
+        """
+        slack = self._slack
+        for i in range(0, len(self._lits)):
+            if self._coeffs[i] <= slack:
+                break
+            lit = self._lits[i]
+            if solver._valueOf(lit) is None:
+                solver._enqueue(lit, self)
+        return True
+
+    def _undo(self, var):
+        """
+        Called when the variable is unassigned during back-tracking.
+        If the variable's literal was counted as False, the slack is restored.
+        :param var: a variable symbol in str format
+        :return: None
+        """
+        i = self._index[var]
+        if self._counted[i]:
+            self._counted[i] = False
+            self._slack += self._coeffs[i]
+
+    def _calculatereason(self, solver, lit, reason):
+        """
+        Lazy explanation of the constraint in clause form.
+        The reason is the list of literals of this constraint which were False before lit was implied,
+        i.e the False literals placed before lit on the solver's trail.
+
+        :param solver: A solver object.
+        :param
+            lit: None for the conflict constraint, otherwise the variable symbol of the implied literal.
+        :param
+            reason: An empty list.
+                    This list will be filled with the False literals of this constraint.
+        :return: None.
+        """
+        limit = solver._getvariableobject(lit)._trailpos if lit is not None else None
+        for i in range(0, len(self._lits)):
+            q = self._lits[i]
+            if q._varsymbol != lit and solver._valueOf(q) is False and \
+                    (limit is None or solver._getvariableobject(q._varsymbol)._trailpos < limit):
+                reason.append(q)
+
+    def _implicationlevel(self, solver, lit):
+        """
+        Decision level at which this constraint implies lit, i.e the highest decision level of its False literals.
+        :param solver: A solver object.
+        :param
+            lit: the implied literal (Literal Object) or None for the decision level of a conflict
+        :return: A number
+        """
+        level = 0
+        for q in self._lits:
+            if q is not lit and solver._valueOf(q) is False:
+                level = max(level, solver._getvariableobject(q._varsymbol)._decisionlevel)
+        return level
+
+    def _issatisfied(self, solver):
+        """
+        :param solver: A solver object
+        :return: True if the sum of the coefficients of the True literals reaches the degree
+        """
+        total = 0
+        for i in range(0, len(self._lits)):
+            if solver._valueOf(self._lits[i]):
+                total += self._coeffs[i]
+        return total >= self._degree
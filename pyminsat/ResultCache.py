@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+
+def formula_hash(clauses):
+    """
+    Canonical hash of a CNF formula.
+    The hash does not depend on the order of the clauses or the order of the literals in a clause.
+    Variables are case-insensitive, duplicate literals / clauses and tautologies (p and -p in a clause) are ignored.
+    :param
+        clauses: list of clauses, each one a list of literals in str format.
+        example: [['a', '-b'], ['c']]
+    :return: hex digest (str)
+    """
+    canonical = set()
+    for clause in clauses:
+        lits = {lit.lower() for lit in clause}
+        key = '\0'.join(sorted(lits))
+        # variable names: the leading '-' of every literal removed
+        names = ('\0' + key).replace('\0-', '\0')[1:]
+        if '-' in names:
+            # a literal with several '-'
+            lits = {_canonicalliteral(lit) for lit in lits}
+            key = '\0'.join(sorted(lits))
+            names = ('\0' + key).replace('\0-', '\0')[1:]
+        if len(set(names.split('\0'))) == len(lits):
+            # no p and -p in the clause
+            canonical.add(key)
+    canonical = sorted(canonical)
+    canonical.append('')
+    # same digest as one update per clause followed by a newline
+    return hashlib.sha256('\n'.join(canonical).encode('utf-8')).hexdigest()
+
+
+def _canonicalliteral(lit):
+    """
+    :return: the literal in lower case with a single leading '-' if it is negated
+    """
+    lit = lit.lower()
+    if '-' in lit[1:]:
+        lit = '-' + lit.replace('-', '')
+    return lit
+
+
+def verify_model(clauses, model):
+    """
+    Check if the model satisfies every clause. Variables missing in the model are treated as False.
+    :param
+        clauses: list of clauses, each one a list of literals in str format.
+    :param
+        model: dict of variable -> True/False, as returned by solver.find_solution()
+    :return: True or False
+    """
+    for clause in clauses:
+        for lit in clause:
+            lit = _canonicalliteral(lit)
+            if lit[0] == '-':
+                if not model.get(lit[1:], False):
+                    break
+            elif model.get(lit, False):
+                break
+        else:
+            return False
+    return True
+
+
+class ResultCache:
+    """
+    Result cache for repeated formulas. Keys are formula_hash() of the clause set,
+    values are the model (dict) of a satisfiable formula or None for an unsatisfiable one.
+
+    Entries are kept in memory with LRU eviction once maxsize is reached.
+    If path (a directory) is provided, every entry is also written there and
+    a memory miss falls back to the on-disk entry.
+
+    Usage:
+        cache = ResultCache(maxsize=1024)
+        model = cache.solve([['a', '-b'], ['b']])
+    or, to cache the results of a solver:
+        solver = Solver(result_cache=cache)
+    """
+    def __init__(self, maxsize=1024, path=None):
+        self.__maxsize = maxsize
+        self.__path = path
+        self.__entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def solve(self, clauses, time_budget=None):
+        """
+        Solve the formula through the cache.
+        The clause lists are hashed and looked up before any solver object is built,
+        so a hit costs the hash and the model check only.
+
+        :param
+            clauses: list of clauses, each one a list of literals in str format. example: [['a', '-b'], ['c']]
+        :param
+            time_budget: optional number of seconds for the solver on a miss (see solver.find_solution())
+        :return:
+            model: if the formula is satisfiable
+            None: otherwise
+        :raises
+            SolverInterrupted: if the time budget is exhausted (nothing is cached then)
+        """
+        key = formula_hash(clauses)
+        hit, model = self.cached(key, clauses)
+        if hit:
+            return model
+        from pyminsat.Solver import Solver
+        solver = Solver()
+        for clause in clauses:
+            solver.add_problem_clause_db(clause)
+        model = solver.find_solution(time_budget=time_budget)
+        self.store(key, model)
+        return model
+
+    def cached(self, key, clauses):
+        """
+        lookup() followed by the check of a cached model against the clauses.
+        A cached model which does not satisfy them is discarded.
+        :param key: formula_hash(clauses)
+        :param clauses: list of clauses, each one a list of literals in str format
+        :return: (hit, model) as returned by lookup()
+        """
+        hit, model = self.lookup(key)
+        if hit and model is not None and not verify_model(clauses, model):
+            self.discard(key)
+            return False, None
+        return hit, model
+
+    def lookup(self, key):
+        """
+        :param key: formula hash
+        :return:
+            (True, model) on a hit. model will be None for an unsatisfiable formula.
+            (False, None) on a miss.
+        """
+        entries = self.__entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            model = entries[key]
+            return True, (dict(model) if model is not None else None)
+        if self.__path is not None:
+            found, model = self.__readdisk(key)
+            if found:
+                self.__remember(key, model)
+                self.hits += 1
+                return True, (dict(model) if model is not None else None)
+        self.misses += 1
+        return False, None
+
+    def store(self, key, model):
+        """
+        :param key: formula hash
+        :param model: model (dict) of the formula or None if the formula is unsatisfiable
+        :return: None
+        """
+        model = dict(model) if model is not None else None
+        self.__remember(key, model)
+        if self.__path is not None:
+            self.__writedisk(key, model)
+
+    def discard(self, key):
+        """
+        Remove the entry from memory and disk. Used when a cached model fails verification.
+        :param key: formula hash
+        :return: None
+        """
+        self.__entries.pop(key, None)
+        if self.__path is not None:
+            try:
+                os.remove(self.__diskpath(key))
+            except FileNotFoundError:
+                pass
+
+    def __remember(self, key, model):
+        self.__entries[key] = model
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.__maxsize:
+            self.__entries.popitem(last=False)
+
+    def __diskpath(self, key):
+        return os.path.join(self.__path, key + '.json')
+
+    def __readdisk(self, key):
+        try:
+            with open(self.__diskpath(key), 'r') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False, None
+        return True, (entry['model'] if entry['sat'] else None)
+
+    def __writedisk(self, key, model):
+        tmp_path = self.__diskpath(key) + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'sat': model is not None, 'model': model}, f)
+        os.replace(tmp_path, self.__diskpath(key))
@@ -1,9 +1,24 @@
+import itertools
+import math
+import time
+from array import array
+
 from pyminsat.Clause import Clause
 from pyminsat.Literals import Literals
+from pyminsat.PBConstraint import PBConstraint
 from pyminsat.Variable import Variable
+from pyminsat.XorMatrix import XorMatrix, find_xors
+
+class SolverInterrupted(Exception):
+    """
+    Raised by solver.find_solution() when the search is stopped through solver.interrupt() or the time budget.
+    """
+    pass
+
 
 class Solver:
-    def __init__(self, custom_branching_heuristics=False):
+    def __init__(self, custom_branching_heuristics=False, checkpoint_path=None, checkpoint_interval=1000,
+                 result_cache=None, chrono_threshold=100, num_vars=None):
         self._clauses = []
         self._learntclause = []
         self.__trail = []
@@ -19,6 +34,18 @@ class Solver:
 
         self.__propQ = []
         self._watches = {}
+        # pseudo-boolean constraints and, for every variable, the constraints to notify when it is unassigned
+        self._constraints = []
+        self._pbwatches = {}
+        # XOR constraints, created with the first one (see solver.add_xor())
+        self._xormatrix = None
+        # becomes False when the problem is found to be unsatisfiable while adding constraints
+        self._ok = True
+
+        # incremental solving: assumptions of the current find_solution() call and the failed ones (unsat core)
+        self.__assumptions = []
+        self.__core = []
+        self.__interrupted = False
         self.__nlearntsallowed = 0
         self._tclausecnt = 0
 
@@ -29,6 +56,32 @@ class Solver:
         self.__variabledecayfactor = 0.95
         self.__custombranching = custom_branching_heuristics
 
+        # periodic auto-checkpoint: after every checkpoint_interval conflicts,
+        # the solver restarts (i.e back-jumps to decision level 0) and writes a checkpoint to checkpoint_path
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be at least 1 conflict")
+        self.__checkpointpath = checkpoint_path
+        self.__checkpointinterval = checkpoint_interval
+        self.__conflictssincecheckpoint = 0
+
+        # optional ResultCache: the problem clauses are recorded (in str format) to compute the formula hash
+        self.__resultcache = result_cache
+        self.__problemclauses = [] if result_cache is not None else None
+
+        # chronological back-tracking: when a conflict would back-jump more than chrono_threshold decision levels,
+        # only the conflict level is undone. None disables it.
+        # While the trail holds literals out of decision level order, the implication levels are computed by _enqueue()
+        self.__chronothreshold = chrono_threshold
+        self.__chronoactive = False
+
+        # SolverObserver objects notified of the search events (see solver.add_observer())
+        self.__observers = []
+        self.__propagationobservers = []
+
+        # literal objects of the int literals (see solver.add_dimacs_clause()), preallocated for num_vars variables:
+        # 2 * var for the positive literal and 2 * var + 1 for the negative one
+        self.__intlits = [None] * (2 * (num_vars if num_vars is not None else 0) + 2)
+
     def add_problem_clause_db(self, literals):
         """
         add a clause of the CNF formula to the SAT solver problem
@@ -39,21 +92,431 @@ class Solver:
         :return: None
         """
 
+        if self.__problemclauses is not None:
+            self.__problemclauses.append(list(literals))
+        self.__backtracktoroot()
         Clause(self, literals, False)
 
-    def find_solution(self):
+    def add_dimacs_clause(self, literals):
+        """
+        add a clause of the CNF formula given as DIMACS style int literals:
+        the variable number, negative if the literal is negated. The variable symbol of the literal 5 (or -5) is '5'.
+
+        This is the lightweight path for small formulas: the literal objects are looked up by int
+        in a store sized from Solver(num_vars=n), instead of parsing str literals.
+
+        :param
+            literals: Array of ints
+            example: [1, -2, 3]
+        :return: None
+        """
+        if self.__problemclauses is not None:
+            self.__problemclauses.append([str(lit) for lit in literals])
+        self.__backtracktoroot()
+        self.__addintclause(literals)
+
+    def add_clauses_array(self, flat_lits, offsets):
+        """
+        add many clauses of the CNF formula at once, given as flat int arrays.
+        Literals are ints in DIMACS style: the variable number, negative if the literal is negated.
+        The variable symbol of the int literal 5 (or -5) is '5'.
+
+        The clauses are added as by add_dimacs_clause(), without its per call work:
+        the solver goes back to the zeroth decision level once, the buffer is sliced clause by clause
+        (it is not copied as a whole) and the activities of the first literals are bumped at once.
+
+        :param
+            flat_lits: int buffer (list, array.array or NumPy array) with the literals of all the clauses
+            example: [1, -2, 3, 2, -4]
+        :param
+            offsets: int buffer with len(clauses) + 1 offsets. Clause i is flat_lits[offsets[i]:offsets[i + 1]]
+            example: [0, 3, 5] for the clauses (1 | -2 | 3) and (2 | -4)
+        :return: None
+        :raises
+            ValueError: if offsets does not start at 0, decreases or does not end at len(flat_lits)
+        """
+        if len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != len(flat_lits) \
+                or any(start > end for start, end in zip(offsets, itertools.islice(offsets, 1, None))):
+            raise ValueError("offsets must start at 0, never decrease and end at len(flat_lits)")
+        self.__backtracktoroot()
+        # slices of array.array / NumPy buffers are converted to lists of ints, one clause at a time
+        tolist = hasattr(flat_lits, 'tolist')
+        problem_clauses = self.__problemclauses
+        # with the default heuristics, the activity bump of the first literal of every clause is done at once
+        bump_in_bulk = type(self)._bumpvariableactivityinclause is Solver._bumpvariableactivityinclause
+        firstcounts = {}
+        for start, end in zip(offsets, itertools.islice(offsets, 1, None)):
+            literals = flat_lits[start:end]
+            if tolist:
+                literals = literals.tolist()
+            if problem_clauses is not None:
+                problem_clauses.append([str(lit) for lit in literals])
+            clause = self.__addintclause(literals, not bump_in_bulk)
+            if clause is not None and bump_in_bulk:
+                first = clause._lits[0]
+                firstcounts[first] = firstcounts.get(first, 0) + 1
+        for lit_obj in firstcounts:
+            lit_symbol = '-' + lit_obj._varsymbol if lit_obj._negate else lit_obj._varsymbol
+            self._literalactivity[lit_symbol] += firstcounts[lit_obj] * self.__variableinc
+
+    def __addintclause(self, literals, bump_activity=True):
+        """
+        add_dimacs_clause() without going back to the zeroth decision level and recording the problem clause.
+        :param literals: Array of ints
+        :param bump_activity: False if the activity of the first literal is bumped by the caller
+        :return: the new Clause object, None if no clause is created (unit, empty, satisfied or tautology)
+        """
+        if len(set(map(abs, literals))) != len(literals):
+            literals = list(dict.fromkeys(literals))
+            if len(set(map(abs, literals))) != len(literals):
+                # p and -p in the same clause
+                return None
+        intlits = self.__intlits
+        try:
+            lit_obj_list = [intlits[2 * lit] if lit > 0 else intlits[1 - 2 * lit] for lit in literals]
+        except IndexError:
+            intlits.extend([None] * (2 * max(map(abs, literals)) + 2 - len(intlits)))
+            lit_obj_list = [intlits[2 * lit] if lit > 0 else intlits[1 - 2 * lit] for lit in literals]
+        if None in lit_obj_list:
+            # literal objects are created on their first use
+            for i in range(0, len(literals)):
+                if lit_obj_list[i] is None:
+                    lit = literals[i]
+                    if lit == 0:
+                        raise ValueError("0 is not a valid literal")
+                    lit_obj = self._getliteralobjectlist([str(lit)])[0]
+                    intlits[2 * lit if lit > 0 else 1 - 2 * lit] = lit_obj
+                    lit_obj_list[i] = lit_obj
+        if len(self.__trail) > 0:
+            # zeroth level simplification, see Clause._simplify()
+            lits = []
+            for lit_obj in lit_obj_list:
+                lit_val = self._valueOf(lit_obj)
+                if lit_val:
+                    return None
+                if lit_val is None:
+                    lits.append(lit_obj)
+            lit_obj_list = lits
+        if len(lit_obj_list) == 0:
+            self._ok = False
+        elif len(lit_obj_list) == 1:
+            if not self._enqueue(lit_obj_list[0]):
+                self._ok = False
+        else:
+            return Clause._fromliterals(self, lit_obj_list, bump_activity)
+        return None
+
+    def add_atmost(self, literals, k):
+        """
+        add a cardinality constraint: at most k of the given literals can be True
+
+        :param
+            literals String[]: Array of Strings
+            example: ['a', '-b', 'c']
+        :param
+            k: A number
+        :return: None
+        """
+        self.add_linear([1] * len(literals), literals, k)
+
+    def add_linear(self, coeffs, literals, rhs):
+        """
+        add a pseudo-boolean constraint: coeffs[0] * literals[0] + coeffs[1] * literals[1] + ... <= rhs
+        A literal is 1 if it is True and 0 otherwise.
+
+        The constraint is normalised to the form
+            sum(c * l) >= degree (c > 0 and each variable occurs once)
+        and propagated natively (see PBConstraint) instead of being encoded into clauses.
+
+        :param
+            coeffs: Array of integers. example: [2, 1, 3]
+        :param
+            literals String[]: Array of Strings
+            example: ['a', '-b', 'c']
+        :param
+            rhs: An integer
+        :return: None
+        """
+        if len(coeffs) != len(literals):
+            raise ValueError("coeffs and literals must have the same length")
+        # weight of each variable's positive literal in sum(w * var) <= rhs
+        weights = {}
+        for i in range(0, len(literals)):
+            lit = literals[i].lower()
+            negate = lit.startswith("-")
+            var_symbol = lit.replace('-', '') if negate else lit
+            if negate:
+                # c * -x = c - c * x
+                rhs = rhs - coeffs[i]
+                weights[var_symbol] = weights.get(var_symbol, 0) - coeffs[i]
+            else:
+                weights[var_symbol] = weights.get(var_symbol, 0) + coeffs[i]
+
+        # sum(w * x) <= rhs  <=>  sum(-w * x) >= -rhs, negative terms are flipped: -c * x = c * -x - c
+        degree = -rhs
+        lits = []
+        pb_coeffs = []
+        for var_symbol in weights:
+            c = -weights[var_symbol]
+            if c > 0:
+                lits.append(var_symbol)
+                pb_coeffs.append(c)
+            elif c < 0:
+                lits.append('-' + var_symbol)
+                pb_coeffs.append(-c)
+                degree = degree - c
+        if degree <= 0:
+            # the constraint is always satisfied
+            return
+        if sum(pb_coeffs) < degree:
+            self._ok = False
+            return
+        pb_coeffs = [min(c, degree) for c in pb_coeffs]
+        if degree == 1:
+            # sum(lits) >= 1 is a clause
+            self.add_problem_clause_db(lits)
+            return
+        self.__backtracktoroot()
+        PBConstraint(self, lits, pb_coeffs, degree)
+
+    def add_xor(self, literals, rhs):
+        """
+        add an XOR constraint: literals[0] ^ literals[1] ^ ... == rhs
+        A literal is 1 if it is True and 0 otherwise.
+        The XOR constraints are propagated together by Gauss-Jordan elimination (see XorMatrix)
+        instead of being encoded into 2^(n-1) clauses.
+
+        :param
+            literals String[]: Array of Strings
+            example: ['a', '-b', 'c']
+        :param
+            rhs: True / False (or 1 / 0)
+        :return: None
+        """
+        self.__backtracktoroot()
+        if self._xormatrix is None:
+            self._xormatrix = XorMatrix(self)
+        self._xormatrix._addrow(self, literals, rhs)
+
+    def detect_xors(self, max_size=5):
+        """
+        Recover the XOR constraints encoded in the problem clauses (e.g by a parity or crypto encoder)
+        and add them through solver.add_xor(), so that they are propagated by Gauss-Jordan elimination as well.
+        The clauses are kept.
+
+        :param
+            max_size: largest XOR to look for. A XOR over k variables is encoded by 2^(k-1) clauses.
+        :return: the number of XOR constraints found
+        """
+        xors = find_xors([clause._lits for clause in self._clauses], max_size)
+        for variables, rhs in xors:
+            self.add_xor(variables, rhs)
+        return len(xors)
+
+    def find_solution(self, assumptions=None, time_budget=None):
         """
         After adding the clause DB, solver.find_solution() can be called to find solution for the SAT problem.
 
-        :param: None
+        The solver is incremental: clauses / constraints can be added after find_solution() and
+        find_solution() can be called again. The learnt clauses are kept between the calls.
+
+        :param
+            assumptions: optional array of literals in str format which are assumed to be True for this call only.
+            example: ['a', '-b']
+            if the problem cannot be satisfied under the assumptions,
+            solver.get_unsat_core() returns the assumptions responsible for it.
+        :param
+            time_budget: optional number of seconds after which the search is stopped.
         :return:
             model: if the solver is able to solve the SAT problem
             None: if the provided SAT CNF formula cannot be satisfied.
+        :raises
+            SolverInterrupted: if the time budget is exhausted or solver.interrupt() is called during the search.
         """
+        self.__backtracktoroot()
+        self.__core = []
+        if not self._ok:
+            return None
+        self.__assumptions = self._getliteralobjectlist(assumptions) if assumptions else []
+        self.__deadline = time.monotonic() + time_budget if time_budget is not None else None
+        key = None
+        if self.__resultcache is not None and len(self._constraints) == 0 and self._xormatrix is None \
+                and len(self.__assumptions) == 0:
+            # imported on use, to keep hashlib / json out of the import of the solver
+            from pyminsat.ResultCache import formula_hash
+            key = formula_hash(self.__problemclauses)
+            # an UnSat verdict is returned as it is, a cached model is re-checked against the clauses
+            hit, model = self.__resultcache.cached(key, self.__problemclauses)
+            if hit:
+                return model
         self.__nlearntsallowed = len(self._clauses) / 3
         # if not self.__simplifyclausedb():
         #     return None
-        return self.__solve()
+        # an interrupt() made while no search was running does not stop this one
+        self.__interrupted = False
+        try:
+            model = self.__solve()
+        finally:
+            self.__interrupted = False
+        if key is not None:
+            self.__resultcache.store(key, model)
+        return model
+
+    def get_unsat_core(self):
+        """
+        After find_solution() returned None for a call with assumptions,
+        this method returns the subset of the assumptions which cannot be satisfied together.
+        The list is empty if the problem cannot be satisfied even without assumptions.
+
+        :return: Array of literals in str format. example: ['a', '-b']
+        """
+        return list(self.__core)
+
+    def interrupt(self):
+        """
+        Stop the running find_solution() call. It can be called from another thread.
+        find_solution() raises SolverInterrupted at its next step.
+        Without a running search, the call has no effect.
+        :return: None
+        """
+        self.__interrupted = True
+
+    def add_observer(self, observer):
+        """
+        Register a SolverObserver, notified of the decisions, conflicts (learnt clause and its LBD),
+        back-jumps, restarts and learnt clause DB reductions of find_solution().
+        Implied literals are reported only to the observers with observer.propagations = True.
+        Without observers, the search runs without any event overhead.
+
+        :param
+            observer: A SolverObserver object. example: TraceRecorder('search.trace')
+        :return: None
+        """
+        self.__observers.append(observer)
+        if observer.propagations:
+            self.__propagationobservers.append(observer)
+            # the instance attribute shadows Solver._enqueue only while it is needed
+            self._enqueue = self.__tracedenqueue
+
+    def remove_observer(self, observer):
+        """
+        :param
+            observer: A SolverObserver object registered through solver.add_observer()
+        :return: None
+        """
+        self.__observers.remove(observer)
+        if observer in self.__propagationobservers:
+            self.__propagationobservers.remove(observer)
+            if len(self.__propagationobservers) == 0:
+                del self._enqueue
+
+    def save_checkpoint(self, path):
+        """
+        Save the clause database (problem and learnt clauses, pseudo-boolean and XOR constraints), the zeroth decision level assignments
+        and the activities of the solver to the given path in a compact binary format.
+        The snapshot can be restored into a new solver through solver.load_checkpoint()
+
+        :param
+            path: file path of the checkpoint
+        :return: None
+        """
+        from pyminsat.Checkpoint import write_checkpoint
+        index = {}
+        for i in range(0, len(self._variablelist)):
+            index[self._variablelist[i]] = i + 1
+
+        def _intlits(clause):
+            return [-index[lit._varsymbol] if lit._negate else index[lit._varsymbol] for lit in clause._lits]
+
+        units = []
+        zeroth_level_end = self.__traillimit[0] if len(self.__traillimit) > 0 else len(self.__trail)
+        for i in range(0, zeroth_level_end):
+            var_obj = self._variableobjectlist[self.__trail[i]]
+            units.append(index[var_obj._symbol] if var_obj._value else -index[var_obj._symbol])
+
+        literal_activity = array('d', [math.nan]) * (2 * len(self._variablelist))
+        for lit_symbol in self._literalactivity:
+            negate = lit_symbol.startswith('-')
+            var_symbol = lit_symbol[1:] if negate else lit_symbol
+            literal_activity[2 * (index[var_symbol] - 1) + (1 if negate else 0)] = self._literalactivity[lit_symbol]
+
+        clauses = [_intlits(clause) for clause in self._clauses]
+        if not self._ok:
+            # the problem is already known to be unsatisfiable: an empty clause keeps it so
+            clauses.append([])
+        xors = self._xormatrix._rowliterals() if self._xormatrix is not None else []
+        write_checkpoint(path, self._variablelist,
+                         clauses,
+                         [_intlits(clause) for clause in self._learntclause],
+                         [clause.clause_activity for clause in self._learntclause],
+                         [_intlits(constraint) for constraint in self._constraints],
+                         [constraint._coeffs for constraint in self._constraints],
+                         [constraint._degree for constraint in self._constraints],
+                         [[index[var] for var in variables] for variables, rhs in xors],
+                         [rhs for variables, rhs in xors],
+                         units, literal_activity, self.__variableinc, self.__clauseinc)
+
+    def load_checkpoint(self, path):
+        """
+        Restore a snapshot written by solver.save_checkpoint() into this solver.
+        The solver must be empty (i.e no clause added yet).
+        After loading, solver.find_solution() continues with the learnt clauses and activities of the snapshot.
+
+        :param
+            path: file path of the checkpoint
+        :return: None
+        """
+        if len(self._variablelist) > 0:
+            raise ValueError("A checkpoint can be loaded only into an empty solver")
+        from pyminsat.Checkpoint import CheckpointData
+        with CheckpointData(path) as data:
+            symbols = data.symbols
+            for symbol in symbols:
+                Variable(self, symbol)
+
+            def _strlits(lits, start, end):
+                out = []
+                for i in range(start, end):
+                    lit = lits[i]
+                    out.append(symbols[lit - 1] if lit > 0 else '-' + symbols[-lit - 1])
+                return out
+
+            offsets = data.clauseoffsets
+            for i in range(0, len(offsets) - 1):
+                lits = _strlits(data.clauselits, offsets[i], offsets[i + 1])
+                if self.__problemclauses is not None:
+                    self.__problemclauses.append(lits)
+                Clause(self, lits, False)
+
+            offsets = data.constraintoffsets
+            for i in range(0, len(offsets) - 1):
+                PBConstraint(self, _strlits(data.constraintlits, offsets[i], offsets[i + 1]),
+                             list(data.constraintcoeffs[offsets[i]:offsets[i + 1]]), data.constraintdegrees[i])
+
+            offsets = data.xoroffsets
+            for i in range(0, len(offsets) - 1):
+                self.add_xor(_strlits(data.xorlits, offsets[i], offsets[i + 1]), data.xorrhs[i])
+
+            for lit in _strlits(data.units, 0, len(data.units)):
+                self._enqueue(self._getliteralobjectlist([lit])[0])
+                if self.__problemclauses is not None:
+                    self.__problemclauses.append([lit])
+
+            offsets = data.learntoffsets
+            for i in range(0, len(offsets) - 1):
+                clause = Clause(self, _strlits(data.learntlits, offsets[i], offsets[i + 1]), True)
+                clause.clause_activity = data.learntactivity[i]
+                self._learntclause.append(clause)
+                if len(clause._lits) == 1:
+                    self._watches[clause._lits[0]._varsymbol].append(clause)
+
+            for i in range(0, len(data.literalactivity)):
+                activity = data.literalactivity[i]
+                if not math.isnan(activity):
+                    lit_symbol = symbols[i // 2] if i % 2 == 0 else '-' + symbols[i // 2]
+                    self._literalactivity[lit_symbol] = activity
+            self.__variableinc = data.variableinc
+            self.__clauseinc = data.clauseinc
 
     def _enqueue(self, lit, from_clause=None):
         """
@@ -86,13 +549,30 @@ class Solver:
                 return True
         else:
             var_obj._value = not lit._negate
-            var_obj._decisionlevel = self.__latestdecisionlevel
+            if from_clause is not None and self.__chronoactive:
+                # after a chronological back-tracking, a literal can be implied below the current decision level
+                var_obj._decisionlevel = from_clause._implicationlevel(self, lit)
+            else:
+                var_obj._decisionlevel = self.__latestdecisionlevel
             var_obj._reason = from_clause
+            var_obj._trailpos = len(self.__trail)
             self.__trail.append(var_obj._symbol)
             self.__propQ.append(var_obj._symbol)
             # self.__literalactivityhistory.append(self._literalactivity.copy())
             return True
 
+    def __tracedenqueue(self, lit, from_clause=None):
+        """
+        solver._enqueue() reporting the implied literals to the observers with observer.propagations = True.
+        """
+        if from_clause is None or self._variableobjectlist[lit._varsymbol]._value is not None:
+            return type(self)._enqueue(self, lit, from_clause)
+        type(self)._enqueue(self, lit, from_clause)
+        lit_symbol = '-' + lit._varsymbol if lit._negate else lit._varsymbol
+        for observer in self.__propagationobservers:
+            observer.on_propagate(lit_symbol, from_clause)
+        return True
+
     def __nAssigns(self):
         """
         :return: Number of variable assignments made so far
@@ -105,12 +585,20 @@ class Solver:
         :param
             lits: String of literals.
             example: ['a', '-b', 'c']
+            Note: literals are case-insensitive. Hence, 'A' and 'a' will be the same literal.
         :return:
             will create a literal object for every literal provided and append it to a list.
             the list will be returned.
         """
         lit_obj_list = []
+        literalobjectlist = self._literalobjectlist
         for lit in lits:
+            lit_obj = literalobjectlist.get(lit)
+            if lit_obj is not None:
+                # already known literal (in lower case)
+                lit_obj_list.append(lit_obj)
+                continue
+            lit = lit.lower()
             negate = lit.startswith("-")
             var_symbol = lit.replace('-', '') if negate else lit
 
@@ -153,10 +641,10 @@ class Solver:
         :return:
             A Variable object type
         """
-        if var_symbol in self._variablelist:
-            return self._variableobjectlist[var_symbol]
-        else:
-            return Variable(self, var_symbol)
+        var_obj = self._variableobjectlist.get(var_symbol)
+        if var_obj is not None:
+            return var_obj
+        return Variable(self, var_symbol)
 
     def __simplifyclausedb(self):
         """
@@ -193,6 +681,9 @@ class Solver:
             1. conflict clause in case of conflict
             2. otherwise,None
         """
+        # the per clause hook is called only if a subclass overrides it
+        handle_activity = type(self)._handleliteralactivityinpropagation is not \
+            Solver._handleliteralactivityinpropagation
         while len(self.__propQ) > 0:
             var = self.__propQ.pop(0)
             temp_clause_list = self._watches[var]
@@ -205,7 +696,7 @@ class Solver:
                         self._watches[var].append(temp_clause_list[j])
                     self.__propQ.clear()
                     return clause
-                else:
+                elif handle_activity:
                     self._handleliteralactivityinpropagation(clause)
 
     def _handleliteralactivityinpropagation(self, clause):
@@ -342,22 +833,66 @@ class Solver:
         model = {}
         loop_count = 0
         while True:
+            if self.__interrupted or (self.__deadline is not None and loop_count % 64 == 0
+                                      and time.monotonic() > self.__deadline):
+                print("Total number of Loops:" + str(loop_count))
+                raise SolverInterrupted()
             conflict = self.__propagate()
             loop_count += 1
             if conflict is not None:
-                if self.__latestdecisionlevel == 0:
+                conflict_level = self.__latestdecisionlevel
+                if self.__chronoactive:
+                    # the literals of the conflict can all be below the current decision level
+                    conflict_level = conflict._implicationlevel(self, None)
+                if conflict_level == 0:
                     # self.__checkintegrity()
+                    # conflict without any decision: the problem stays unsatisfiable for further calls
+                    self._ok = False
                     print("Total number of Loops:" + str(loop_count))
                     return None
+                self.__canceluntil(conflict_level)
                 learnt_clause = []
                 bt_level = self.__analyseconflict(conflict, learnt_clause)
+                if self.__chronothreshold is not None and \
+                        self.__latestdecisionlevel - bt_level > self.__chronothreshold:
+                    # chronological back-tracking: the asserting literal is implied out of order at bt_level
+                    bt_level = self.__latestdecisionlevel - 1
+                    self.__chronoactive = True
+                if self.__observers:
+                    self.__notifyconflict(learnt_clause, bt_level)
                 self.__canceluntil(bt_level)
                 self.__recordlearntclause(learnt_clause)
                 self.__handledecayactivities()
+                self.__conflictssincecheckpoint += 1
             else:
+                if self.__checkpointpath is not None and \
+                        self.__conflictssincecheckpoint >= self.__checkpointinterval:
+                    self.__restart()
+                    for observer in self.__observers:
+                        observer.on_restart()
+                    self.save_checkpoint(self.__checkpointpath)
+                    self.__conflictssincecheckpoint = 0
+                    continue
                 if (len(self._learntclause) - self.__nAssigns()) >= self.__nlearntsallowed:
                     self.__reduceDB()
-                if self._ismodelfound():
+                if self.__latestdecisionlevel < len(self.__assumptions):
+                    # assumptions are decided first, one decision level per assumption
+                    lit = self.__assumptions[self.__latestdecisionlevel]
+                    lit_val = self._valueOf(lit)
+                    if lit_val is False:
+                        self.__analysefinal(lit)
+                        print("Total number of Loops:" + str(loop_count))
+                        return None
+                    self.__latestdecisionlevel = self.__latestdecisionlevel + 1
+                    if lit_val:
+                        # already True: open an empty decision level to keep levels and assumptions aligned
+                        self.__traillimit.append(len(self.__trail))
+                    else:
+                        self.__assume(lit)
+                    for observer in self.__observers:
+                        observer.on_decide('-' + lit._varsymbol if lit._negate else lit._varsymbol,
+                                           self.__latestdecisionlevel)
+                elif self._ismodelfound():
                     # model found
                     for var in self._variableobjectlist:
                         model[var] = self._variableobjectlist[var]._value if self._variableobjectlist[var]._value is not None else False
@@ -368,6 +903,27 @@ class Solver:
                     lit = self._getnextliteralobject()
                     self.__latestdecisionlevel = self.__latestdecisionlevel + 1
                     self.__assume(lit)
+                    for observer in self.__observers:
+                        observer.on_decide('-' + lit._varsymbol if lit._negate else lit._varsymbol,
+                                           self.__latestdecisionlevel)
+
+    def __notifyconflict(self, learnt_clause, bt_level):
+        """
+        Report a conflict and the following back-jump to the observers.
+        Called after the conflict analysis, before back-jumping: the literals of the learnt clause are still assigned,
+        hence their decision levels give the LBD.
+        :param
+            learnt_clause: Array of literals in str format, learnt_clause[0] is the asserting literal
+        :param
+            bt_level: back-jumping level
+        :return: None
+        """
+        levels = {self.__latestdecisionlevel}
+        for lit in learnt_clause[1:]:
+            levels.add(self._variableobjectlist[lit[1:] if lit.startswith('-') else lit]._decisionlevel)
+        for observer in self.__observers:
+            observer.on_conflict(self.__latestdecisionlevel, list(learnt_clause), len(levels))
+            observer.on_backjump(self.__latestdecisionlevel, bt_level)
 
     def _ismodelfound(self):
         """
@@ -390,8 +946,43 @@ class Solver:
         for clause in self._clauses:
             if not self._valueOf(clause._lits[0]):
                 return False
+        for constraint in self._constraints:
+            if not constraint._issatisfied(self):
+                return False
+        if self._xormatrix is not None and not self._xormatrix._issatisfied(self):
+            return False
         return True
 
+    def __analysefinal(self, lit):
+        """
+        Compute the unsat core when the assumption lit is found False.
+        Starting from lit, the reasons of the assignments are followed back on the trail.
+        Every decision met on the way is an assumption (assumptions are decided before any other variable),
+        and it is added to the core along with lit itself.
+
+        :param
+            lit: the failed assumption (Literal Object)
+        :return: None
+        """
+        self.__core = ['-' + lit._varsymbol if lit._negate else lit._varsymbol]
+        var_obj = self._getvariableobject(lit._varsymbol)
+        if var_obj._decisionlevel == 0:
+            return
+        seen = {lit._varsymbol}
+        for i in range(len(self.__trail) - 1, self.__traillimit[0] - 1, -1):
+            var = self.__trail[i]
+            if var not in seen:
+                continue
+            var_obj = self._getvariableobject(var)
+            if var_obj._reason is None:
+                self.__core.append(var if var_obj._value else '-' + var)
+            else:
+                reason = []
+                var_obj._reason._calculatereason(self, var, reason)
+                for q in reason:
+                    if self._getvariableobject(q._varsymbol)._decisionlevel > 0:
+                        seen.add(q._varsymbol)
+
     def __analyseconflict(self, conflict, learnt_clause):
         """
         This method will compute
@@ -401,6 +992,9 @@ class Solver:
             1. leave room for asserting literal
             2. push all the literals that forced the literals of the conflict clause to take the value assigned now.
             3. set learnt_clause[0] = asserting literal
+            4. set learnt_clause[1] = a literal of the back-jumping level, so that it is watched along with learnt_clause[0]
+        The conflict must be at the current decision level (see solver.__solve()).
+        The trail is only read: the assignments are undone afterwards by solver.__canceluntil().
 
         :param
             conflict: A Clause object - the conflict clause found during the propagation process
@@ -439,13 +1033,14 @@ class Solver:
         #                         bt_level = max(bt_level, lit.decision_level)
         #                 ]
         #             ]
-        #             //pick the next variable for conflict reason analysis:
+        #             //pick the next variable for conflict reason analysis, walking the trail backwards:
         #             do
         #             [
-        #                 p = the last assigned variable
+        #                 p = trail[index--]
         #                 conflict = p.reason
-        #                 undoone() //to reset and pop the last assigned variable in trail list
-        #             ]while (!seen[p]) //only literals with (seen[p]=True) can be the nxt literal for conflict analysis
+        #             ]while (!seen[p] || p.decision_level != current_decision_level)
+        #             //only literals with (seen[p]=True) can be the nxt literal for conflict analysis.
+        #             //after a chronological back-tracking, lower level literals can be placed between them.
         #     ]while(counter > 0)
         #     Note : p will be the asserting literal.
         #             The value of 'p' present while breaking the condition counter > 0 will be the asserting literal.
@@ -453,39 +1048,45 @@ class Solver:
         p = None
         p_lit = None
         p_reason = []
+        # variable symbol -> literal in str format, as it appears (False) in the reasons
         seen = {}
+        index = len(self.__trail) - 1
 
         learnt_clause.append(None)
         bt_level = 0
+        bt_index = 0
 
         while True:
             p_reason = []
             conflict._calculatereason(self, p, p_reason)
             for i in range(0, len(p_reason)):
                 q = p_reason[i]
-                if seen.get(q._varsymbol) is None or seen[q._varsymbol].get('seen') is False:
-                    seen[q._varsymbol] = {'seen': True, 'negate': q._negate}
+                if q._varsymbol not in seen:
+                    seen[q._varsymbol] = '-' + q._varsymbol if q._negate else q._varsymbol
                     var_obj = self._getvariableobject(q._varsymbol)
                     if var_obj._decisionlevel == self.__latestdecisionlevel:
                         counter = counter + 1
-                        if var_obj._reason is None:
-                            bt_level = var_obj._decisionlevel
                     elif var_obj._decisionlevel > 0:
-                        l_clause_lit = q._varsymbol if seen[q._varsymbol].get('negate') is False else '-' + q._varsymbol
-                        learnt_clause.append(l_clause_lit)
-                        bt_level = max(bt_level, var_obj._decisionlevel)
+                        learnt_clause.append(seen[q._varsymbol])
+                        if var_obj._decisionlevel > bt_level:
+                            bt_level = var_obj._decisionlevel
+                            bt_index = len(learnt_clause) - 1
             while True:
-                p = self.__trail[len(self.__trail) - 1]
+                p = self.__trail[index]
+                index = index - 1
                 var_obj = self._getvariableobject(p)
-                conflict = var_obj._reason
-                self.__undoone()
-                if seen.get(p) is not None and seen[p].get('seen') is True:
-                    p_lit = p if seen[p].get('negate') is False else '-' + p
+                if p in seen and var_obj._decisionlevel == self.__latestdecisionlevel:
+                    conflict = var_obj._reason
+                    p_lit = seen[p]
                     break
             counter = counter - 1
             if counter == 0:
                 break
         learnt_clause[0] = p_lit
+        if bt_index > 1:
+            # literals of the learnt clause sit at mixed decision levels:
+            # lits[1] is watched, hence it must be the last one to be unassigned while back-tracking
+            learnt_clause[1], learnt_clause[bt_index] = learnt_clause[bt_index], learnt_clause[1]
         return bt_level
 
     def __handledecayactivities(self):
@@ -560,6 +1161,9 @@ class Solver:
                 The limit will be based on clauseinc and sizeof(leantclause)
         :return: None
         """
+        if len(self._learntclause) == 0:
+            return
+        before = len(self._learntclause)
         i = 0
         cla_lim = self.__clauseinc / len(self._learntclause)
 
@@ -574,21 +1178,29 @@ class Solver:
             if not l_cla._islocked(self) and l_cla.clause_activity < cla_lim:
                 l_cla._removeclause(self)
             i = i + 1
+        for observer in self.__observers:
+            observer.on_reduce(before, len(self._learntclause))
 
-    def __undoone(self):
+    def __undoone(self, var_obj):
         """
-        The last assigned variable will be unassigned by resetting the followings:
+        The given assigned variable will be unassigned by resetting the followings:
             1. variable.value
             2. variable.decision_level
             3. variable.reason
-        Note: The last unassigned variable will be fetched from solver.__trail
+        The pseudo-boolean constraints of the variable are notified as well.
+        Note: the caller removes the variable from solver.__trail
+        :param
+            var_obj: A Variable object
         :return: None
         """
-        var = self.__trail.pop()
-        var_obj = self._variableobjectlist[var]
         var_obj._value = None
         var_obj._decisionlevel = -1
         var_obj._reason = None
+        var_obj._trailpos = -1
+        constraints = self._pbwatches.get(var_obj._symbol)
+        if constraints is not None:
+            for constraint in constraints:
+                constraint._undo(var_obj._symbol)
         # self._literalactivity = self.__literalactivityhistory.pop()
 
     def __canceluntil(self, bt_level):
@@ -596,32 +1208,55 @@ class Solver:
         This method will be useful for performing back-jumping.
         All the decision level until the given bt_level will be undone
 
+        The assignments are undone from the end of the trail down to the first assignment of the decision level
+        bt_level + 1. After a chronological back-tracking, this part of the trail can also hold literals implied
+        at bt_level or below: these are kept, moved down the trail (in the same order) and propagated again,
+        as the literals which were watching their clauses may have been undone.
+
         :param
             bt_level: A number (i.e decision_level)
         :return: None
         """
-        while self.__latestdecisionlevel > bt_level:
-            self.__cancelonelevel()
+        if self.__latestdecisionlevel <= bt_level:
+            return
+        start = self.__traillimit[bt_level]
+        kept = []
+        for i in range(len(self.__trail) - 1, start - 1, -1):
+            var_obj = self._variableobjectlist[self.__trail[i]]
+            if var_obj._decisionlevel > bt_level:
+                self.__undoone(var_obj)
+            else:
+                kept.append(var_obj)
+        del self.__trail[start:]
+        del self.__traillimit[bt_level:]
+        self.__latestdecisionlevel = bt_level
+        if len(self.__propQ) > 0:
+            self.__propQ[:] = [var for var in self.__propQ if self._variableobjectlist[var]._value is not None]
+        for i in range(len(kept) - 1, -1, -1):
+            var_obj = kept[i]
+            var_obj._trailpos = len(self.__trail)
+            self.__trail.append(var_obj._symbol)
+            self.__propQ.append(var_obj._symbol)
+        if bt_level == 0:
+            # the trail is in decision level order again
+            self.__chronoactive = False
 
-    def __cancelonelevel(self):
+    def __backtracktoroot(self):
         """
-        All the Assignments made in one decision level will be undone in this method
-            1. solver.__latestdecisionlevel will be reduced by 1.
-            2. pop the solver.__traillimit stack.
-
-        Explanation for computation of c:
-        self.__trail = nAssign() so far [say for example: 9]
-        self.__traillimit[last] = nAssign() till the previous decision level [say for example: 6]
-        Hence, c = 3 (i.e 3 assignments after the previous decision level).
+        Undo the assignments of a previous find_solution() call (if any),
+        so that clauses can be added and the search can start again from the zeroth decision level.
+        :return: None
+        """
+        if self.__latestdecisionlevel > 0:
+            self.__canceluntil(0)
 
+    def __restart(self):
+        """
+        Undo all the decisions, i.e back-jump to the zeroth decision level.
+        Assignments of the zeroth decision level and the learnt clauses are kept.
         :return: None
         """
-        c = len(self.__trail) - self.__traillimit[len(self.__traillimit) - 1]
-        while c != 0:
-            self.__undoone()
-            c = c - 1
-        self.__latestdecisionlevel = self.__latestdecisionlevel - 1
-        self.__traillimit.pop()
+        self.__canceluntil(0)
 
 
 def _getkeyforclausesort(obj):
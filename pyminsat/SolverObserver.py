@@ -0,0 +1,188 @@
+import struct
+import time
+
+
+class SolverObserver:
+    """
+    Base class of the observers registered through solver.add_observer().
+    Override the events of interest, the others do nothing.
+    Literals are passed in str format. example: 'a', '-b'
+
+    on_propagate() is called for every implied literal, hence it is only called for observers with
+    propagations = True. Without such an observer, the solver's propagation path is not changed at all.
+    """
+    propagations = False
+
+    def on_decide(self, lit, level):
+        """
+        :param lit: the decided literal (an assumption or a branching decision)
+        :param level: the new decision level
+        """
+        pass
+
+    def on_propagate(self, lit, reason):
+        """
+        :param lit: the implied literal
+        :param reason: the clause / constraint object which implied it
+        """
+        pass
+
+    def on_conflict(self, level, learnt, lbd):
+        """
+        :param level: decision level of the conflict
+        :param learnt: the learnt clause (Array of literals in str format), learnt[0] is the asserting literal
+        :param lbd: number of distinct decision levels in the learnt clause
+        """
+        pass
+
+    def on_backjump(self, from_level, to_level):
+        pass
+
+    def on_restart(self):
+        pass
+
+    def on_reduce(self, before, after):
+        """
+        :param before: number of learnt clauses before the learnt clause DB reduction
+        :param after: number of learnt clauses after it
+        """
+        pass
+
+
+# Trace file layout: _TRACE_MAGIC, then records made of a one byte event code and a fixed payload.
+# Literals are ints: +/- symbol id. A symbol record (id, name) is written before the first use of a variable.
+_TRACE_MAGIC = b'PYMSTRC1'
+_SYMBOL = struct.Struct('<cIH')
+_DECIDE = struct.Struct('<ciI')
+_PROPAGATE = struct.Struct('<ci')
+_CONFLICT = struct.Struct('<cdIII')
+_BACKJUMP = struct.Struct('<cII')
+_RESTART = struct.Struct('<cd')
+_REDUCE = struct.Struct('<cdII')
+_LITERALS = struct.Struct('<i')
+
+
+class TraceRecorder(SolverObserver):
+    """
+    Observer writing the search events to a compact binary trace, to be analysed offline with read_trace().
+    Conflict, restart and reduce records carry the time (in seconds) since the recorder was created.
+
+    Usage:
+        recorder = TraceRecorder('search.trace')
+        solver.add_observer(recorder)
+        solver.find_solution()
+        recorder.close()
+    """
+    def __init__(self, path, propagations=False, buffer_size=1 << 16):
+        self.propagations = propagations
+        self.__file = open(path, 'wb')
+        self.__file.write(_TRACE_MAGIC)
+        self.__buffer = bytearray()
+        self.__buffersize = buffer_size
+        self.__ids = {}
+        self.__start = time.monotonic()
+
+    def __lit(self, lit):
+        negate = lit.startswith('-')
+        var = lit[1:] if negate else lit
+        var_id = self.__ids.get(var)
+        if var_id is None:
+            var_id = len(self.__ids) + 1
+            self.__ids[var] = var_id
+            name = var.encode('utf-8')
+            self.__buffer += _SYMBOL.pack(b'S', var_id, len(name))
+            self.__buffer += name
+        return -var_id if negate else var_id
+
+    def __write(self, record):
+        self.__buffer += record
+        if len(self.__buffer) >= self.__buffersize:
+            self.flush()
+
+    def on_decide(self, lit, level):
+        self.__write(_DECIDE.pack(b'D', self.__lit(lit), level))
+
+    def on_propagate(self, lit, reason):
+        self.__write(_PROPAGATE.pack(b'P', self.__lit(lit)))
+
+    def on_conflict(self, level, learnt, lbd):
+        lits = [self.__lit(lit) for lit in learnt]
+        record = _CONFLICT.pack(b'C', time.monotonic() - self.__start, level, lbd, len(lits))
+        self.__write(record + struct.pack('<%di' % len(lits), *lits))
+
+    def on_backjump(self, from_level, to_level):
+        self.__write(_BACKJUMP.pack(b'B', from_level, to_level))
+
+    def on_restart(self):
+        self.__write(_RESTART.pack(b'R', time.monotonic() - self.__start))
+
+    def on_reduce(self, before, after):
+        self.__write(_REDUCE.pack(b'X', time.monotonic() - self.__start, before, after))
+
+    def flush(self):
+        self.__file.write(self.__buffer)
+        self.__buffer = bytearray()
+        self.__file.flush()
+
+    def close(self):
+        self.flush()
+        self.__file.close()
+
+
+def read_trace(path):
+    """
+    Read a trace written by TraceRecorder.
+    :param path: trace file path
+    :return: generator of event tuples:
+        ('decide', lit, level)
+        ('propagate', lit)
+        ('conflict', time, level, lbd, learnt)
+        ('backjump', from_level, to_level)
+        ('restart', time)
+        ('reduce', time, before, after)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(_TRACE_MAGIC):
+        raise ValueError("not a pyminsat trace: " + str(path))
+    names = {}
+
+    def _lit(lit):
+        return names[lit] if lit > 0 else '-' + names[-lit]
+
+    offset = len(_TRACE_MAGIC)
+    while offset < len(data):
+        code = data[offset:offset + 1]
+        if code == b'S':
+            _, var_id, size = _SYMBOL.unpack_from(data, offset)
+            offset += _SYMBOL.size
+            names[var_id] = data[offset:offset + size].decode('utf-8')
+            offset += size
+        elif code == b'D':
+            _, lit, level = _DECIDE.unpack_from(data, offset)
+            offset += _DECIDE.size
+            yield 'decide', _lit(lit), level
+        elif code == b'P':
+            _, lit = _PROPAGATE.unpack_from(data, offset)
+            offset += _PROPAGATE.size
+            yield 'propagate', _lit(lit)
+        elif code == b'C':
+            _, at, level, lbd, size = _CONFLICT.unpack_from(data, offset)
+            offset += _CONFLICT.size
+            lits = struct.unpack_from('<%di' % size, data, offset)
+            offset += size * _LITERALS.size
+            yield 'conflict', at, level, lbd, [_lit(lit) for lit in lits]
+        elif code == b'B':
+            _, from_level, to_level = _BACKJUMP.unpack_from(data, offset)
+            offset += _BACKJUMP.size
+            yield 'backjump', from_level, to_level
+        elif code == b'R':
+            _, at = _RESTART.unpack_from(data, offset)
+            offset += _RESTART.size
+            yield 'restart', at
+        elif code == b'X':
+            _, at, before, after = _REDUCE.unpack_from(data, offset)
+            offset += _REDUCE.size
+            yield 'reduce', at, before, after
+        else:
+            raise ValueError("corrupted trace record at offset " + str(offset))
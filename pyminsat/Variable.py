@@ -4,7 +4,9 @@ class Variable:
         self._value = None
         self._reason = None
         self._decisionlevel = 0
-        if symbol not in solver._variablelist:
+        # position of the variable in the solver's trail while it is assigned
+        self._trailpos = -1
+        if symbol not in solver._variableobjectlist:
             solver._variablelist.append(symbol)
             solver._variableobjectlist[symbol] = self
             solver._watches[symbol] = []
@@ -0,0 +1,277 @@
+class XorMatrix:
+    """
+    The XOR constraints of a solver, propagated by Gauss-Jordan elimination.
+
+    Every variable of an XOR constraint is a column of the matrix. A row is a Python int bit mask of its columns
+    and a rhs bit: the XOR of the row's variables must be equal to rhs.
+    The rows are kept in reduced row echelon form: every row has a pivot column which occurs in no other row.
+
+    The rows are only combined with each other (never with the assignments), hence every row stays implied by
+    the added XOR constraints and can be used as the reason of its implications. While propagating, a row whose pivot
+    gets assigned takes an unassigned column as its new pivot (which is eliminated from the other rows).
+    With every pivot unassigned, a row with a single unassigned column implies it and a row without any
+    is either satisfied or a conflict. Nothing has to be undone while back-tracking.
+
+    The matrix watches every variable of its columns, like PBConstraint: _propagate() is called when
+    a variable is assigned and _undo() when it is unassigned.
+    """
+    def __init__(self, solver):
+        self._columns = []
+        self._colindex = {}
+        # literal objects of every column: (positive literal, negative literal)
+        self._litobjs = []
+        self._rows = []
+        self._rhs = []
+        self._pivots = []
+        # columns assigned (and already delivered through _propagate()) and those which are True
+        self._assigned = 0
+        self._true = 0
+        self.__conflict = None
+
+    def _addrow(self, solver, lits, rhs):
+        """
+        Add the constraint lits[0] ^ lits[1] ^ ... == rhs. The solver must be at the zeroth decision level.
+        :param solver: A solver object
+        :param lits: Array of literals in str format. example: ['a', '-b', 'c']
+        :param rhs: True / False (or 1 / 0)
+        :return: None
+        """
+        mask = 0
+        rhs = 1 if rhs else 0
+        for lit in lits:
+            lit = lit.lower()
+            negate = lit.startswith("-")
+            var_symbol = lit.replace('-', '') if negate else lit
+            if negate:
+                # -x = x ^ 1
+                rhs ^= 1
+            mask ^= 1 << self.__column(solver, var_symbol)
+        # eliminate the pivots of the existing rows
+        for i in range(0, len(self._rows)):
+            if mask >> self._pivots[i] & 1:
+                mask ^= self._rows[i]
+                rhs ^= self._rhs[i]
+        if mask == 0:
+            if rhs:
+                # 0 == 1: the constraints cannot be satisfied
+                solver._ok = False
+            return
+        unassigned = mask & ~self._assigned
+        pivot = _lowestcolumn(unassigned if unassigned else mask)
+        for i in range(0, len(self._rows)):
+            if self._rows[i] >> pivot & 1:
+                self._rows[i] ^= mask
+                self._rhs[i] ^= rhs
+        self._rows.append(mask)
+        self._rhs.append(rhs)
+        self._pivots.append(pivot)
+        if not self.__check(solver, list(range(0, len(self._rows)))):
+            solver._ok = False
+
+    def __column(self, solver, var_symbol):
+        """
+        :return: the column of the variable. A new column watching the variable is added if needed.
+        """
+        col = self._colindex.get(var_symbol)
+        if col is not None:
+            return col
+        col = len(self._columns)
+        lit_objs = solver._getliteralobjectlist([var_symbol, '-' + var_symbol])
+        self._columns.append(lit_objs[0]._varsymbol)
+        self._colindex[var_symbol] = col
+        self._litobjs.append((lit_objs[0], lit_objs[1]))
+        solver._watches[var_symbol].append(self)
+        solver._pbwatches.setdefault(var_symbol, []).append(self)
+        value = solver._getvariableobject(var_symbol)._value
+        if value is not None:
+            # already assigned in the zeroth decision level
+            self._assigned |= 1 << col
+            if value:
+                self._true |= 1 << col
+        return col
+
+    def _propagate(self, solver, var):
+        """
+        This method is used to propagate the matrix after a variable of its columns is assigned a value.
+        The matrix is always added back to the variable's watches list.
+
+        :param solver: A solver object
+        :param var: a variable symbol in str format
+        :return:
+            1. False if a row cannot be satisfied anymore (conflict)
+            2. True otherwise
+        """
+        solver._watches[var].append(self)
+        bit = 1 << self._colindex[var]
+        self._assigned |= bit
+        if solver._getvariableobject(var)._value:
+            self._true |= bit
+        else:
+            self._true &= ~bit
+        col = self._colindex[var]
+        return self.__check(solver, [i for i in range(0, len(self._rows)) if self._rows[i] >> col & 1])
+
+    def __check(self, solver, todo):
+        """
+        Bring the pivots of the given rows back to unassigned columns and propagate the rows.
+        Rows modified on the way are checked as well.
+        :param solver: A solver object
+        :param todo: Array of row indexes
+        :return: False in case of conflict (see _calculatereason()), True otherwise
+        """
+        queued = set(todo)
+        while len(todo) > 0:
+            i = todo.pop()
+            queued.discard(i)
+            mask = self._rows[i]
+            unassigned = mask & ~self._assigned
+            if unassigned and not unassigned >> self._pivots[i] & 1:
+                # the pivot is assigned: eliminate a new unassigned pivot from the other rows
+                pivot = _lowestcolumn(unassigned)
+                for j in range(0, len(self._rows)):
+                    if j != i and self._rows[j] >> pivot & 1:
+                        self._rows[j] ^= mask
+                        self._rhs[j] ^= self._rhs[i]
+                        if j not in queued:
+                            queued.add(j)
+                            todo.append(j)
+                self._pivots[i] = pivot
+            if unassigned == 0:
+                if _parity(mask & self._true) != self._rhs[i]:
+                    self.__conflict = _XorReason(self, mask)
+                    return False
+            elif unassigned & (unassigned - 1) == 0:
+                # a single unassigned column: its value is implied by the row
+                col = _lowestcolumn(unassigned)
+                value = self._rhs[i] ^ _parity(mask & self._true)
+                lit = self._litobjs[col][0 if value else 1]
+                if not solver._enqueue(lit, _XorReason(self, mask)):
+                    # the variable was assigned the other value, but it is not propagated yet
+                    self.__conflict = _XorReason(self, mask)
+                    return False
+        return True
+
+    def _undo(self, var):
+        """
+        Called when the variable is unassigned during back-tracking.
+        :param var: a variable symbol in str format
+        :return: None
+        """
+        bit = 1 << self._colindex[var]
+        self._assigned &= ~bit
+        self._true &= ~bit
+
+    def _calculatereason(self, solver, lit, reason):
+        """
+        Explanation of the last conflict of the matrix: the literals of the conflicting row, all False.
+        (the implications of the matrix have their own reason objects, see _XorReason)
+        """
+        self.__conflict._calculatereason(solver, lit, reason)
+
+    def _implicationlevel(self, solver, lit):
+        """
+        :return: the decision level of the last conflict of the matrix
+        """
+        return self.__conflict._implicationlevel(solver, lit)
+
+    def _issatisfied(self, solver):
+        """
+        :param solver: A solver object
+        :return: True if every column is assigned and every row has the parity of its rhs
+        """
+        for i in range(0, len(self._rows)):
+            if self._rows[i] & ~self._assigned or _parity(self._rows[i] & self._true) != self._rhs[i]:
+                return False
+        return True
+
+    def _rowliterals(self):
+        """
+        :return: Array of (variable symbols, rhs) of the rows, e.g for save_checkpoint()
+        """
+        return [([self._columns[col] for col in _columns(self._rows[i])], self._rhs[i])
+                for i in range(0, len(self._rows))]
+
+
+class _XorReason:
+    """
+    Reason of an assignment made by the matrix, in clause form:
+    every other variable of the row (as it was when the assignment was made) with its current value.
+    """
+    def __init__(self, matrix, mask):
+        self._matrix = matrix
+        self._mask = mask
+
+    def _calculatereason(self, solver, lit, reason):
+        """
+        :param solver: A solver object.
+        :param
+            lit: None for a conflict, otherwise the variable symbol of the implied literal.
+        :param
+            reason: An empty list.
+                    This list will be filled with the (False) literals of the other variables of the row.
+        :return: None.
+        """
+        matrix = self._matrix
+        for col in _columns(self._mask):
+            var = matrix._columns[col]
+            if var != lit:
+                reason.append(matrix._litobjs[col][1 if solver._getvariableobject(var)._value else 0])
+
+    def _implicationlevel(self, solver, lit):
+        """
+        :return: the highest decision level of the other variables of the row
+        """
+        level = 0
+        for col in _columns(self._mask):
+            var = self._matrix._columns[col]
+            if lit is None or var != lit._varsymbol:
+                level = max(level, solver._getvariableobject(var)._decisionlevel)
+        return level
+
+
+def find_xors(clauses, max_size=5):
+    """
+    Recover the XOR constraints encoded in CNF.
+    x1 ^ x2 ^ ... ^ xk == rhs is encoded by the 2^(k-1) clauses over x1..xk forbidding each assignment of the
+    wrong parity. The forbidden assignment of a clause sets its literals False, hence its parity is
+    the number of negated literals (mod 2).
+
+    :param clauses: Array of clauses, each one an array of literal objects
+    :param max_size: largest XOR to look for (the encoding has 2^(max_size-1) clauses)
+    :return: Array of (variable symbols, rhs)
+    """
+    groups = {}
+    for lits in clauses:
+        if len(lits) < 2 or len(lits) > max_size:
+            continue
+        variables = frozenset(lit._varsymbol for lit in lits)
+        if len(variables) != len(lits):
+            continue
+        pattern = frozenset(lit._varsymbol for lit in lits if lit._negate)
+        groups.setdefault(variables, set()).add(pattern)
+    xors = []
+    for variables in groups:
+        count = [0, 0]
+        for pattern in groups[variables]:
+            count[len(pattern) % 2] += 1
+        needed = 1 << (len(variables) - 1)
+        for parity in (0, 1):
+            if count[parity] == needed:
+                # the clauses forbid every assignment with this parity
+                xors.append((sorted(variables), 1 - parity))
+    return xors
+
+
+def _lowestcolumn(mask):
+    return (mask & -mask).bit_length() - 1
+
+
+def _columns(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _parity(mask):
+    return bin(mask).count('1') & 1
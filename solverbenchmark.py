@@ -0,0 +1,58 @@
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from pyminsat.Solver import Solver
+
+
+def random_formula(rnd, num_vars, num_clauses, width=3):
+    """
+    :return: random k-SAT formula as a list of clauses of DIMACS style int literals
+    """
+    return [[var if rnd.random() < 0.5 else -var for var in rnd.sample(range(1, num_vars + 1), width)]
+            for _ in range(0, num_clauses)]
+
+
+def solve_str(formula, num_vars):
+    solver = Solver()
+    for clause in formula:
+        solver.add_problem_clause_db([str(lit) for lit in clause])
+    return solver.find_solution()
+
+
+def solve_dimacs(formula, num_vars):
+    solver = Solver(num_vars=num_vars)
+    for clause in formula:
+        solver.add_dimacs_clause(clause)
+    return solver.find_solution()
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+
+if __name__ == '__main__':
+    # end-to-end latency (solver construction + clauses + find_solution) of small formulas
+    parser = argparse.ArgumentParser(description="pyminsat latency micro-benchmark for small formulas")
+    parser.add_argument('--formulas', type=int, default=2000)
+    parser.add_argument('--vars', type=int, default=20)
+    parser.add_argument('--clauses', type=int, default=80)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    formulas = [random_formula(rnd, args.vars, args.clauses) for _ in range(0, args.formulas)]
+    for name, solve in (('str literals', solve_str), ('int literals', solve_dimacs)):
+        latencies = []
+        # the solver prints the number of loops of every search
+        with contextlib.redirect_stdout(io.StringIO()):
+            for formula in formulas:
+                start = time.perf_counter()
+                solve(formula, args.vars)
+                latencies.append(time.perf_counter() - start)
+        print("%-13s p50: %8.1f us   p99: %8.1f us   (%d formulas, %d vars, %d clauses)"
+              % (name, percentile(latencies, 50) * 1e6, percentile(latencies, 99) * 1e6,
+                 args.formulas, args.vars, args.clauses))
@@ -0,0 +1,132 @@
+import contextlib
+import io
+import itertools
+import random
+import unittest
+
+from pyminsat.Solver import Solver
+from pyminsat.SolverObserver import SolverObserver
+
+
+def _value(model, lit):
+    return model.get(lit.lstrip('-'), False) != lit.startswith('-')
+
+
+class _Formula:
+    """
+    Random clauses, pseudo-boolean and XOR constraints over v0..v(num_vars - 1), with a brute force check.
+    """
+    def __init__(self, num_vars):
+        self.num_vars = num_vars
+        self.clauses = []
+        self.linears = []
+        self.xors = []
+
+    def satisfied(self, model):
+        return all(any(_value(model, lit) for lit in clause) for clause in self.clauses) \
+            and all(sum(coeff for coeff, lit in zip(coeffs, lits) if _value(model, lit)) <= rhs
+                    for coeffs, lits, rhs in self.linears) \
+            and all(sum(_value(model, lit) for lit in lits) % 2 == rhs for lits, rhs in self.xors)
+
+    def satisfiable(self, assumptions=()):
+        for bits in itertools.product([False, True], repeat=self.num_vars):
+            model = {'v%d' % i: bits[i] for i in range(0, self.num_vars)}
+            if all(_value(model, lit) for lit in assumptions) and self.satisfied(model):
+                return True
+        return False
+
+    def add_to(self, solver):
+        for clause in self.clauses:
+            solver.add_problem_clause_db(clause)
+        for coeffs, lits, rhs in self.linears:
+            solver.add_linear(coeffs, lits, rhs)
+        for lits, rhs in self.xors:
+            solver.add_xor(lits, rhs)
+
+
+class _LongBackjumpCounter(SolverObserver):
+    """
+    Counts the back-jumps of more than one decision level: with chrono_threshold=0, they are chronological.
+    """
+    def __init__(self):
+        self.count = 0
+
+    def on_backjump(self, from_level, to_level):
+        if from_level - to_level > 1:
+            self.count += 1
+
+
+class ChronologicalBacktrackingTest(unittest.TestCase):
+    """
+    chrono_threshold=0 (every back-jump of more than one level is chronological) against None (plain back-jumping),
+    both checked by brute force: same satisfiability, models satisfying every constraint,
+    unsat cores made of assumptions which cannot be satisfied together.
+    """
+    def __check(self, formula, rnd, assumption_rounds=2):
+        counter = _LongBackjumpCounter()
+        solvers = {}
+        for threshold in (None, 0):
+            solver = Solver(chrono_threshold=threshold)
+            if threshold is None:
+                solver.add_observer(counter)
+            formula.add_to(solver)
+            solvers[threshold] = solver
+        rounds = [[]] + [['%sv%d' % (rnd.choice(['', '-']), rnd.randrange(formula.num_vars)) for _ in range(0, 3)]
+                         for _ in range(0, assumption_rounds)]
+        for assumptions in rounds:
+            expected = formula.satisfiable(assumptions)
+            for threshold in (None, 0):
+                solver = solvers[threshold]
+                with contextlib.redirect_stdout(io.StringIO()):
+                    model = solver.find_solution(assumptions=assumptions)
+                with self.subTest(threshold=threshold, assumptions=assumptions):
+                    self.assertEqual(expected, model is not None)
+                    if model is not None:
+                        self.assertTrue(formula.satisfied(model))
+                        self.assertTrue(all(_value(model, lit) for lit in assumptions))
+                    else:
+                        core = solver.get_unsat_core()
+                        self.assertTrue(set(core) <= set(assumptions))
+                        self.assertFalse(formula.satisfiable(core))
+        return counter.count
+
+    def test_random_3sat(self):
+        long_backjumps = 0
+        for seed in range(0, 40):
+            rnd = random.Random(seed)
+            formula = _Formula(rnd.randint(10, 14))
+            for _ in range(0, int(formula.num_vars * 4.3)):
+                formula.clauses.append(['%sv%d' % (rnd.choice(['', '-']), var)
+                                        for var in rnd.sample(range(0, formula.num_vars), 3)])
+            long_backjumps += self.__check(formula, rnd)
+        # the searches only differ (and the comparison is only meaningful) after a back-jump of more than one level
+        self.assertGreater(long_backjumps, 0)
+
+    def test_pseudo_boolean(self):
+        for seed in range(0, 40):
+            rnd = random.Random(seed)
+            formula = _Formula(rnd.randint(6, 10))
+            for _ in range(0, formula.num_vars * 2):
+                formula.clauses.append(['%sv%d' % (rnd.choice(['', '-']), var)
+                                        for var in rnd.sample(range(0, formula.num_vars), rnd.randint(2, 3))])
+            for _ in range(0, rnd.randint(1, 4)):
+                lits = ['%sv%d' % (rnd.choice(['', '-']), var) for var in rnd.sample(range(0, formula.num_vars), 4)]
+                formula.linears.append(([rnd.randint(1, 3) for _ in lits], lits, rnd.randint(1, 5)))
+            self.__check(formula, rnd)
+
+    def test_xor(self):
+        for seed in range(0, 40):
+            rnd = random.Random(seed)
+            formula = _Formula(rnd.randint(6, 10))
+            for _ in range(0, formula.num_vars * 2):
+                formula.clauses.append(['%sv%d' % (rnd.choice(['', '-']), var)
+                                        for var in rnd.sample(range(0, formula.num_vars), rnd.randint(2, 3))])
+            for _ in range(0, rnd.randint(1, formula.num_vars // 2)):
+                lits = ['%sv%d' % (rnd.choice(['', '-']), var)
+                        for var in rnd.sample(range(0, formula.num_vars), rnd.randint(2, 5))]
+                formula.xors.append((lits, rnd.randint(0, 1)))
+            self.__check(formula, rnd)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import array
+import contextlib
+import io
+import itertools
+import random
+import unittest
+
+from pyminsat.Solver import Solver
+
+
+def _satisfiable(num_vars, clauses):
+    for bits in itertools.product([False, True], repeat=num_vars):
+        if all(any(bits[abs(lit) - 1] != (lit < 0) for lit in clause) for clause in clauses):
+            return True
+    return False
+
+
+class ClausesArrayTest(unittest.TestCase):
+    def test_invalid_offsets(self):
+        for offsets in ([0, 2], [1, 3], [0, 2, 1, 3], [0, 3, 4], []):
+            with self.subTest(offsets=offsets):
+                with self.assertRaises(ValueError):
+                    Solver().add_clauses_array([1, 2, 3], offsets)
+
+    def test_buffers_against_brute_force(self):
+        for seed in range(0, 100):
+            rnd = random.Random(seed)
+            num_vars = rnd.randint(2, 8)
+            clauses = [[rnd.choice([-1, 1]) * rnd.randint(1, num_vars) for _ in range(0, rnd.randint(1, 4))]
+                       for _ in range(0, rnd.randint(0, 25))]
+            split = rnd.randint(0, len(clauses))
+            flat = [lit for clause in clauses[split:] for lit in clause]
+            offsets = [0]
+            for clause in clauses[split:]:
+                offsets.append(offsets[-1] + len(clause))
+            if seed % 2:
+                flat, offsets = array.array('i', flat), array.array('q', offsets)
+
+            solver = Solver()
+            for clause in clauses[:split]:
+                solver.add_dimacs_clause(clause)
+            solver.add_clauses_array(flat, offsets)
+            with contextlib.redirect_stdout(io.StringIO()):
+                model = solver.find_solution()
+            with self.subTest(seed=seed):
+                self.assertEqual(_satisfiable(num_vars, clauses), model is not None)
+                if model is not None:
+                    for clause in clauses:
+                        # variables only found in tautologies are not in the model
+                        self.assertTrue(any(model.get(str(abs(lit)), False) != (lit < 0) for lit in clause))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import contextlib
+import io
+import itertools
+import random
+import unittest
+
+from pyminsat.MaxSat import MaxSatSolver
+from pyminsat.Solver import SolverInterrupted
+
+
+def _satisfied(model, clause):
+    return any(model.get(lit.lstrip('-'), False) != lit.startswith('-') for lit in clause)
+
+
+def _cost(model, softs):
+    return sum(weight for clause, weight in softs if not _satisfied(model, clause))
+
+
+def _optimum(num_vars, hard, softs):
+    """
+    :return: the lowest cost over every assignment satisfying the hard clauses, None if there is none
+    """
+    best = None
+    for bits in itertools.product([False, True], repeat=num_vars):
+        model = {'v%d' % i: bits[i] for i in range(0, num_vars)}
+        if all(_satisfied(model, clause) for clause in hard):
+            cost = _cost(model, softs)
+            best = cost if best is None else min(best, cost)
+    return best
+
+
+def _instance(seed):
+    rnd = random.Random(seed)
+    num_vars = rnd.randint(4, 9)
+
+    def _lit():
+        return ('-' if rnd.random() < 0.5 else '') + 'v%d' % rnd.randrange(num_vars)
+
+    hard = [[_lit() for _ in range(0, rnd.randint(2, 3))] for _ in range(0, rnd.randint(0, 10))]
+    softs = [([_lit() for _ in range(0, rnd.randint(1, 2))], rnd.randint(1, 5)) for _ in range(0, rnd.randint(3, 12))]
+    return rnd, num_vars, hard, softs
+
+
+class MaxSatReentryTest(unittest.TestCase):
+    """
+    solve() is stopped after a few solver calls (as a time budget would do) and called again:
+    the second call must still find the optimum, with a lower bound which does not exceed it.
+    """
+    def test_interrupted_then_solved_again(self):
+        for seed in range(0, 60):
+            for first, second in (('oll', 'oll'), ('linear', 'linear'), ('oll', 'linear'), ('linear', 'oll')):
+                rnd, num_vars, hard, softs = _instance(seed)
+                maxsat = MaxSatSolver()
+                for clause in hard:
+                    maxsat.add_hard(clause)
+                for clause, weight in softs:
+                    maxsat.add_soft(clause, weight)
+                optimum = _optimum(num_vars, hard, softs)
+
+                find_solution = maxsat._solver.find_solution
+                calls = [0]
+                stop = rnd.randint(2, 6)
+
+                def _limited(*args, **kwargs):
+                    calls[0] += 1
+                    if calls[0] > stop:
+                        raise SolverInterrupted()
+                    return find_solution(*args, **kwargs)
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    maxsat._solver.find_solution = _limited
+                    maxsat.solve(first)
+                    maxsat._solver.find_solution = find_solution
+                    model = maxsat.solve(second)
+
+                with self.subTest(seed=seed, first=first, second=second):
+                    if optimum is None:
+                        self.assertIsNone(model)
+                        continue
+                    self.assertTrue(maxsat.optimal)
+                    self.assertEqual(optimum, maxsat.cost)
+                    self.assertEqual(optimum, _cost(model, softs))
+                    self.assertLessEqual(maxsat.lower_bound, optimum)
+                    self.assertTrue(all(_satisfied(model, clause) for clause in hard))
+
+
+if __name__ == '__main__':
+    unittest.main()